@@ -0,0 +1,72 @@
+import ast
+
+
+class BundleConfig:
+    """
+    Parses the _resources/bundle_config notebook of a demo: the notebook source contains a python dict literal
+    (True/False/None, triple-quoted strings...). It's parsed with the python AST, without executing anything.
+    """
+    #key: (expected type, required). Lists are described as [item schema], dicts as {key: (type, required)}
+    NOTEBOOK_SCHEMA = {"path": (str, True), "title": (str, True), "description": (str, True), "pre_run": (bool, True),
+                       "publish_on_website": (bool, True), "add_cluster_setup_cell": (bool, False), "parameters": (dict, False),
+                       "depends_on_previous": (bool, False), "depends_on": ([str], False), "libraries": (list, False),
+                       "warehouse_id": (str, False), "object_type": (str, False)}
+    SCHEMA = {"name": (str, True), "category": (str, True), "title": (str, True), "description": (str, True),
+              "bundle": (bool, False), "tags": (list, False), "notebooks": ([NOTEBOOK_SCHEMA], False),
+              "cluster": (dict, False), "cluster_libraries": (list, False), "workflows": (list, False), "pipelines": (list, False),
+              "repos": (list, False), "init_job": (dict, False), "dashboards": (list, False), "sql_queries": (list, False),
+              "serverless_supported": (bool, False), "custom_schema_supported": (bool, False), "create_cluster": (bool, False),
+              "default_schema": (str, False), "default_catalog": (str, False), "custom_message": (str, False),
+              "data_folders": ([{"source_folder": (str, True), "source_format": (str, True), "target_format": (str, True)}], False),
+              "genie_rooms": ([{"id": (str, True), "table_identifiers": ([str], True)}], False)}
+    #json-style literals are accepted too
+    JSON_CONSTANTS = {"true": True, "false": False, "null": None}
+
+    @staticmethod
+    def parse(content: str, config_path: str):
+        """returns the config dict defined in the notebook (last dict expression of the notebook)"""
+        try:
+            tree = ast.parse(content)
+        except SyntaxError as e:
+            raise Exception(f"incorrect python syntax in {config_path} line {e.lineno}: {e.msg}")
+        expressions = [node.value for node in tree.body if isinstance(node, ast.Expr) and isinstance(node.value, ast.Dict)]
+        if len(expressions) == 0:
+            raise Exception(f"no config found in {config_path}. The cell should contain a python dict.")
+        expression = BundleConfig.JsonConstantTransformer().visit(expressions[-1])
+        try:
+            return ast.literal_eval(expression)
+        except ValueError as e:
+            raise Exception(f"incorrect setting in {config_path}: {e}. The config should only contain literals (no variable or function call).")
+
+    class JsonConstantTransformer(ast.NodeTransformer):
+        def visit_Name(self, node):
+            if node.id in BundleConfig.JSON_CONSTANTS:
+                return ast.copy_location(ast.Constant(BundleConfig.JSON_CONSTANTS[node.id]), node)
+            return node
+
+    @staticmethod
+    def validate(conf, schema = None, path = ""):
+        """returns the list of errors of the config (empty if valid)"""
+        if schema is None:
+            schema = BundleConfig.SCHEMA
+        if not isinstance(conf, dict):
+            return [f"{path or 'config'} should be a dict, got {type(conf).__name__}"]
+        errors = []
+        for key, (expected_type, required) in schema.items():
+            key_path = f"{path}.{key}" if path else key
+            if key not in conf:
+                if required:
+                    errors.append(f"{key_path} is required")
+            elif isinstance(expected_type, list):
+                if not isinstance(conf[key], list):
+                    errors.append(f"{key_path} should be a list, got {type(conf[key]).__name__}")
+                    continue
+                for i, item in enumerate(conf[key]):
+                    if isinstance(expected_type[0], dict):
+                        errors.extend(BundleConfig.validate(item, expected_type[0], f"{key_path}[{i}]"))
+                    elif not isinstance(item, expected_type[0]):
+                        errors.append(f"{key_path}[{i}] should be a {expected_type[0].__name__}, got {type(item).__name__}")
+            #optional settings can be explicitly set to None
+            elif not isinstance(conf[key], expected_type) and not (conf[key] is None and not required):
+                errors.append(f"{key_path} should be a {expected_type.__name__}, got {type(conf[key]).__name__}")
+        return errors
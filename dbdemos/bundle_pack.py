@@ -0,0 +1,133 @@
+import io
+import json
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+
+
+class BundlePack:
+    """
+    Single file holding all the files of a demo bundle (install_package, dashboards...), each entry compressed
+    independently (zlib, or zstd which requires the zstandard package to install) so it can be read without the others.
+    Layout: MAGIC | entries | json index {path: [offset, compressed size, size]} | index offset & length | MAGIC
+    Entries are read from a memory map of the file, avoiding one open/read per bundle file, and decompressed as a stream:
+    the compressed entry is never copied out of the memory map.
+    """
+    FILE_NAME = "bundle.pack"
+    MAGIC = b"DBDPACK1"
+    FOOTER = struct.Struct("<QQ8s")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index_offset, index_length, magic = BundlePack.FOOTER.unpack(self.mmap[-BundlePack.FOOTER.size:])
+        if magic != BundlePack.MAGIC or self.mmap[:len(BundlePack.MAGIC)] != BundlePack.MAGIC:
+            raise Exception(f"{path} isn't a valid bundle pack.")
+        index = json.loads(self.mmap[index_offset:index_offset+index_length])
+        self.compression = index["compression"]
+        self.entries = index["entries"]
+        self.folders = set()
+        for name in self.entries:
+            parts = name.split("/")
+            for i in range(1, len(parts)):
+                self.folders.add("/".join(parts[:i]))
+
+    @staticmethod
+    def get_compressor(compression: str):
+        if compression == "zstd":
+            import zstandard
+            return zstandard.ZstdCompressor(level=10).compress
+        return lambda content: zlib.compress(content, 9)
+
+    #Read-only stream decompressing a zlib entry chunk by chunk from the memory map
+    class ZlibEntryReader(io.RawIOBase):
+        CHUNK_SIZE = 64*1024
+
+        def __init__(self, content: memoryview):
+            self.content = content
+            self.position = 0
+            self.decompressor = zlib.decompressobj()
+
+        def readable(self):
+            return True
+
+        def readinto(self, b):
+            data = b""
+            while len(data) == 0 and not self.decompressor.eof:
+                if len(self.decompressor.unconsumed_tail) > 0:
+                    data = self.decompressor.decompress(self.decompressor.unconsumed_tail, len(b))
+                elif self.position < len(self.content):
+                    chunk = self.content[self.position:self.position+self.CHUNK_SIZE]
+                    self.position += len(chunk)
+                    data = self.decompressor.decompress(chunk, len(b))
+                else:
+                    raise Exception("truncated bundle pack entry")
+            b[:len(data)] = data
+            return len(data)
+
+        #releases the memory map view, the pack can't be closed while it's exported
+        def close(self):
+            self.content.release()
+            super().close()
+
+    #Packs all the files under folder (except the excluded paths, relative to folder). Returns the list of packed files.
+    @staticmethod
+    def create(folder: str, pack_path: str, exclude = [], compression: str = "zlib"):
+        compress = BundlePack.get_compressor(compression)
+        files = sorted(str(p.relative_to(folder).as_posix()) for p in Path(folder).rglob("*") if p.is_file())
+        files = [f for f in files if f not in exclude and f != BundlePack.FILE_NAME]
+        entries = {}
+        tmp_path = pack_path+".tmp"
+        with open(tmp_path, "wb") as pack:
+            pack.write(BundlePack.MAGIC)
+            for file in files:
+                with open(folder+"/"+file, "rb") as f:
+                    content = f.read()
+                compressed = compress(content)
+                entries[file] = [pack.tell(), len(compressed), len(content)]
+                pack.write(compressed)
+            index = json.dumps({"compression": compression, "entries": entries}).encode('utf-8')
+            index_offset = pack.tell()
+            pack.write(index)
+            pack.write(BundlePack.FOOTER.pack(index_offset, len(index), BundlePack.MAGIC))
+        os.replace(tmp_path, pack_path)
+        return files
+
+    def close(self):
+        self.mmap.close()
+
+    def exists(self, name: str):
+        return name in self.entries or name in self.folders
+
+    def isdir(self, name: str):
+        return name in self.folders
+
+    def listdir(self, name: str = ""):
+        prefix = name.rstrip("/")+"/" if name not in ["", "/"] else ""
+        return sorted(set(n[len(prefix):].split("/")[0] for n in self.entries if n.startswith(prefix)))
+
+    #Returns a binary stream of the decompressed entry
+    def open(self, name: str):
+        if name not in self.entries:
+            raise FileNotFoundError(f"{name} not found in bundle pack {self.path}")
+        offset, compressed_size, size = self.entries[name]
+        content = memoryview(self.mmap)[offset:offset+compressed_size]
+        if self.compression == "zstd":
+            import zstandard
+            return zstandard.ZstdDecompressor().stream_reader(content)
+        return io.BufferedReader(BundlePack.ZlibEntryReader(content))
+
+    def read(self, name: str):
+        size = self.entries[name][2] if name in self.entries else 0
+        content = bytearray(size)
+        with self.open(name) as f:
+            read = f.readinto(content)
+            while read < size:
+                chunk = f.readinto(memoryview(content)[read:])
+                if chunk == 0:
+                    raise Exception(f"truncated entry {name} in bundle pack {self.path}")
+                read += chunk
+        return content
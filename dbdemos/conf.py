@@ -41,12 +41,20 @@ class Conf():
         self.branch = branch
         self.github_token = github_token
         self.run_test_as_username = run_test_as_username
+        #dbdemos instance pool of the workspace, set by the InstancePoolManager
+        self.demo_pool_id = None
 
     def get_repo_path(self):
         return self.repo_staging_path+"/"+self.repo_name
 
-    #Add internal pool id to accelerate our demos & unit tests
+    #dbdemos pool to accelerate our demos & unit tests: the pool resolved by the InstancePoolManager, or our internal org pool
     def get_demo_pool(self):
+        if self.demo_pool_id is not None:
+            return self.demo_pool_id
+        return self.get_org_demo_pool()
+
+    #Add internal pool id to accelerate our demos & unit tests
+    def get_org_demo_pool(self):
         if self.org_id == "1444828305810485" or "e2-demo-field-eng" in self.workspace_url:
             return "0727-104344-hauls13-pool-uftxk0r6"
         if self.org_id == "1660015457675682" or self.is_dev_env():
@@ -117,6 +125,21 @@ class DBClient():
         with requests.get(url, headers = self.conf.headers, params=params, timeout=60) as r:
             return self.get_json_result(url, r, print_auth_error)
 
+    #Yields the response by chunks instead of loading it in memory (large exports)
+    def stream(self, path: str, params: dict = {}, chunk_size = 1024*1024):
+        url = self.conf.workspace_url+"/api/"+self.clean_path(path)
+        with requests.get(url, headers = self.conf.headers, params=params, timeout=60, stream=True) as r:
+            if r.status_code != 200:
+                raise Exception(f"Error calling {url}: {r.status_code} - {r.text}")
+            for chunk in r.iter_content(chunk_size):
+                yield chunk
+
+    #Streams a binary response (ex: workspace export with direct_download) to a local file.
+    def download(self, path: str, params: dict, destination_path: str, chunk_size = 1024*1024):
+        with open(destination_path, "wb") as f:
+            for chunk in self.stream(path, params, chunk_size):
+                f.write(chunk)
+
     def delete(self, path: str, params: dict = {}):
         url = self.conf.workspace_url+"/api/"+self.clean_path(path)
         with requests.delete(url, headers = self.conf.headers, params=params, timeout=60) as r:
@@ -177,7 +200,7 @@ class DataFolder():
 
 class DemoNotebook():
     def __init__(self, path: str, title: str, description: str, pre_run: bool = False, publish_on_website: bool = False,
-                 add_cluster_setup_cell: bool = False, parameters: dict = {}, depends_on_previous: bool = True, libraries: list = [], warehouse_id = None, object_type = None):
+                 add_cluster_setup_cell: bool = False, parameters: dict = {}, depends_on_previous: bool = True, libraries: list = [], warehouse_id = None, object_type = None, depends_on: list = None):
         self.path = path
         self.title = title
         self.description = description
@@ -189,6 +212,8 @@ class DemoNotebook():
         self.libraries = libraries
         self.warehouse_id = warehouse_id
         self.object_type = object_type
+        #notebook paths this notebook depends on in the test job. Overrides depends_on_previous when set
+        self.depends_on = depends_on
 
     def __repr__(self):
         return self.path
@@ -223,6 +248,8 @@ class DemoConf():
         self.init_job = json_conf.get('init_job', {})
         self.job_id = None
         self.run_id = None
+        #Tasks (by task key) of previous successful runs, for the notebooks which weren't re-executed in run_id
+        self.previous_task_runs = {}
         if path.startswith('/'):
             path = path[1:]
         self.path = path
@@ -261,7 +288,7 @@ class DemoConf():
             libraries = n.get('libraries', [])
             warehouse_id = n.get('warehouse_id', None)
             self.notebooks.append(DemoNotebook(n['path'], n['title'], n['description'], n['pre_run'], n['publish_on_website'],
-                                               add_cluster_setup_cell, params, depends_on_previous, libraries, warehouse_id, n.get('object_type', None)))
+                                               add_cluster_setup_cell, params, depends_on_previous, libraries, warehouse_id, n.get('object_type', None), n.get('depends_on', None)))
 
         self._notebook_lock = threading.Lock()
 
@@ -297,14 +324,15 @@ class DemoConf():
     def get_notebooks_to_publish(self):
         return [n for n in self.notebooks if n.publish_on_website]
 
-    def get_bundle_path(self):
-        return self.get_bundle_root_path() + "/install_package"
+    #bundles_folder: "bundles", or "bundles_lite" for the notebooks packaged with capped results
+    def get_bundle_path(self, bundles_folder = "bundles"):
+        return self.get_bundle_root_path(bundles_folder) + "/install_package"
 
-    def get_bundle_dashboard_path(self):
-        return self.get_bundle_root_path() + "/dashboards"
+    def get_bundle_dashboard_path(self, bundles_folder = "bundles"):
+        return self.get_bundle_root_path(bundles_folder) + "/dashboards"
 
-    def get_bundle_root_path(self):
-        return "dbdemos/bundles/"+self.name
+    def get_bundle_root_path(self, bundles_folder = "bundles"):
+        return f"dbdemos/{bundles_folder}/"+self.name
 
     def get_minisite_path(self):
         return "dbdemos/minisite/"+self.name
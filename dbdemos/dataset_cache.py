@@ -0,0 +1,44 @@
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from .export_cache import ExportCache
+
+
+class DatasetCache(ExportCache):
+    """
+    Local cache of the dbdemos-dataset files, shared by all the installs running on the same driver.
+    Entries are keyed by source url + ETag (or size). Above max_size bytes, the least recently used entries are evicted,
+    except the entries in use (see use_entry).
+    """
+    DEFAULT_FOLDER = f"{tempfile.gettempdir()}/dbdemos_dataset_cache"
+    DEFAULT_MAX_SIZE = 10*1024*1024*1024
+
+    def __init__(self, folder: str = DEFAULT_FOLDER, max_size: int = DEFAULT_MAX_SIZE):
+        super().__init__(folder, max_size, max_age=None)
+        #path => number of threads using the entry
+        self.pins = {}
+
+    @staticmethod
+    def get_dataset_key(url: str, etag: str = None, size: int = None):
+        return ExportCache.get_key("dataset", url.split('?')[0], etag if etag is not None else size)
+
+    #Yields the path of the cached file, downloaded with download(path) if missing.
+    #The entry can't be evicted until the block exits: the eviction runs once the file isn't used anymore.
+    @contextmanager
+    def use_entry(self, key: str, download):
+        path = str(Path(self.get_path(key)))
+        with self.eviction_lock:
+            self.pins[path] = self.pins.get(path, 0) + 1
+        try:
+            super().get_or_download(key, download)
+            yield path
+        finally:
+            with self.eviction_lock:
+                self.pins[path] -= 1
+                if self.pins[path] == 0:
+                    del self.pins[path]
+            self.evict()
+
+    def is_in_use(self, path: str):
+        return path in self.pins
@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pkg_resources
+import requests
+
+
+class DatasetManifest:
+    """
+    Index of the dbdemos-dataset files: {"version": <git tree sha>, "files": {path: {"size": int, "sha": <git blob sha>}}}.
+    Shipped in the package (resources/dataset_manifest.json, created when packaging). Otherwise fetched once from the
+    GitHub git trees API (one call for the whole repo) and cached on the local disk.
+    """
+    REPO = "databricks-demos/dbdemos-dataset"
+    BRANCH = "main"
+    S3_URL = "https://dbdemos-dataset.s3.amazonaws.com/"
+    RESOURCE_PATH = "resources/dataset_manifest.json"
+    CACHE_PATH = f"{tempfile.gettempdir()}/dbdemos_dataset_manifest.json"
+    CACHE_TTL_SECONDS = 24*3600
+
+    _manifest = None
+    _manifest_lock = threading.Lock()
+
+    def __init__(self, manifest: dict):
+        self.version = manifest["version"]
+        self.files = manifest["files"]
+
+    @staticmethod
+    def get():
+        with DatasetManifest._manifest_lock:
+            if DatasetManifest._manifest is None:
+                DatasetManifest._manifest = DatasetManifest.load()
+            return DatasetManifest._manifest
+
+    @staticmethod
+    def load():
+        if pkg_resources.resource_exists("dbdemos", DatasetManifest.RESOURCE_PATH):
+            return DatasetManifest(json.loads(pkg_resources.resource_string("dbdemos", DatasetManifest.RESOURCE_PATH)))
+        cache = Path(DatasetManifest.CACHE_PATH)
+        if cache.exists() and time.time() - cache.stat().st_mtime < DatasetManifest.CACHE_TTL_SECONDS:
+            return DatasetManifest(json.loads(cache.read_text()))
+        manifest = DatasetManifest.fetch()
+        try:
+            manifest.save(DatasetManifest.CACHE_PATH)
+        except OSError as e:
+            print(f"WARN: couldn't cache the dataset manifest in {DatasetManifest.CACHE_PATH}: {e}")
+        return manifest
+
+    @staticmethod
+    def fetch(github_token: str = None):
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if github_token is not None:
+            headers["Authorization"] = f"token {github_token}"
+        response = requests.get(f"https://api.github.com/repos/{DatasetManifest.REPO}/git/trees/{DatasetManifest.BRANCH}?recursive=1", headers=headers)
+        if response.status_code != 200:
+            raise Exception(f"Error fetching the dataset manifest: {response.status_code}, {response.text}")
+        tree = response.json()
+        if tree.get("truncated", False):
+            print(f"WARN: dataset manifest truncated by github, some files of {DatasetManifest.REPO} might be missing")
+        files = {f["path"]: {"size": f["size"], "sha": f["sha"]} for f in tree["tree"] if f["type"] == "blob"}
+        return DatasetManifest({"version": tree["sha"], "files": files})
+
+    def save(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps({"version": self.version, "files": self.files}))
+        os.replace(tmp_path, path)
+
+    #files directly under the folder: [{"path", "name", "size", "sha"}]
+    def list_files(self, folder: str):
+        folder = folder.strip("/") + "/"
+        return [{"path": path, "name": path[len(folder):], **f} for path, f in sorted(self.files.items())
+                if path.startswith(folder) and "/" not in path[len(folder):]]
+
+    @staticmethod
+    def get_url(path: str):
+        return DatasetManifest.S3_URL + path
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class ExportCache:
+    """
+    Local content-addressed cache of the workspace exports used by the packager.
+    Keys must identify immutable content: (repo path, head commit, object path) for repo objects,
+    or the task run id for pre-run notebooks.
+    evict() removes the entries not used for max_age seconds, then the least recently used ones above max_size bytes.
+    """
+    DEFAULT_MAX_SIZE = 20*1024*1024*1024
+    DEFAULT_MAX_AGE = 30*24*3600
+
+    def __init__(self, folder: str, max_size: int = DEFAULT_MAX_SIZE, max_age: int = DEFAULT_MAX_AGE):
+        self.folder = folder
+        self.max_size = max_size
+        self.max_age = max_age
+        self.eviction_lock = threading.Lock()
+        #key => [lock, number of threads holding or waiting for the lock]
+        self.locks = {}
+        self.locks_lock = threading.Lock()
+
+    @staticmethod
+    def get_key(*parts):
+        return hashlib.sha1("\x00".join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+    def get_path(self, key: str):
+        return f"{self.folder}/{key[:2]}/{key}"
+
+    def get(self, key: str):
+        path = self.get_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            content = f.read()
+        self.touch(path)
+        return content
+
+    #the modification time is the last access time of the entry
+    def touch(self, path: str):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def put(self, key: str, content: bytes):
+        path = self.get_path(key)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        #write then rename so that a crash never leaves a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    #The lock of a key is dropped once no thread uses it anymore, so the locks don't grow with the number of keys.
+    @contextmanager
+    def lock_key(self, key: str):
+        with self.locks_lock:
+            entry = self.locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self.locks[key]
+
+    #Concurrent calls with the same key wait for the first fetch instead of downloading the content again.
+    def get_or_fetch(self, key: str, fetch):
+        with self.lock_key(key):
+            content = self.get(key)
+            if content is None:
+                content = fetch()
+                self.put(key, content)
+            return content
+
+    #Same as get_or_fetch for large content: download(path) writes the entry to disk directly. Returns the entry path.
+    def get_or_download(self, key: str, download):
+        with self.lock_key(key):
+            path = self.get_path(key)
+            if os.path.exists(path):
+                self.touch(path)
+            else:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    download(tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            return path
+
+    #entries can't be evicted while in use (see DatasetCache)
+    def is_in_use(self, path: str):
+        return False
+
+    def evict(self):
+        with self.eviction_lock:
+            entries = []
+            for path in Path(self.folder).glob("*/*"):
+                try:
+                    if not path.name.endswith(".tmp"):
+                        stat = path.stat()
+                        entries.append((stat.st_mtime, stat.st_size, path))
+                except FileNotFoundError:
+                    #evicted by another process
+                    pass
+            total_size = sum(size for _, size, _ in entries)
+            expiration = time.time() - self.max_age if self.max_age is not None else None
+            for mtime, size, path in sorted(entries, key=lambda e: e[0]):
+                expired = expiration is not None and mtime < expiration
+                if not expired and (self.max_size is None or total_size <= self.max_size):
+                    break
+                if not self.is_in_use(str(path)):
+                    path.unlink(missing_ok=True)
+                    total_size -= size
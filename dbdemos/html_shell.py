@@ -0,0 +1,56 @@
+import json
+import hashlib
+import re
+
+
+class HtmlShell:
+    """
+    Exported notebook HTML pages are made of the same large Databricks viewer shell (css/js links, static settings...)
+    around a small __DATABRICKS_NOTEBOOK_MODEL payload. The packager stores the shell once per shell version under
+    dbdemos/shells/<shell_id>.html and each notebook as a small model file, the installer re-assembles the page.
+    """
+    SHELL_FOLDER = "shells"
+    MODEL_EXTENSION = ".model.json"
+    MODEL_PLACEHOLDER = "{{DBDEMOS_NOTEBOOK_MODEL}}"
+    TITLE_PLACEHOLDER = "{{DBDEMOS_NOTEBOOK_TITLE}}"
+
+    @staticmethod
+    def split(html: str):
+        """returns (shell_id, shell, model) where model is the json-serializable notebook part of the page"""
+        match = re.search(r'__DATABRICKS_NOTEBOOK_MODEL = \'(.*?)\'', html)
+        if match is None:
+            raise Exception("Can't find __DATABRICKS_NOTEBOOK_MODEL in the notebook html, can't extract the html shell.")
+        shell = html[:match.start(1)] + HtmlShell.MODEL_PLACEHOLDER + html[match.end(1):]
+        title = None
+        title_match = re.search(r'<title>(.*?)</title>', shell)
+        if title_match is not None:
+            title = title_match.group(1)
+            shell = shell[:title_match.start(1)] + HtmlShell.TITLE_PLACEHOLDER + shell[title_match.end(1):]
+        shell_id = hashlib.sha1(shell.encode('utf-8')).hexdigest()[:16]
+        return shell_id, shell, {"shell": shell_id, "title": title, "model": match.group(1)}
+
+    @staticmethod
+    def extract_static_settings(html: str, assets_src: str):
+        """Moves the inline __STATIC_SETTINGS__ script (most of the page size, same for all the pages) to an asset file.
+        returns (html, asset_name, asset_content), asset_name is None if the page doesn't have static settings"""
+        start = html.find("<script>window.__STATIC_SETTINGS__")
+        if start < 0:
+            return html, None, None
+        end = html.index("</script>", start)
+        script = html[start+len("<script>"):end]
+        asset_name = f"static-settings-{hashlib.sha1(script.encode('utf-8')).hexdigest()[:16]}.js"
+        return html[:start] + f'<script src="{assets_src}{asset_name}">' + html[end:], asset_name, script
+
+    @staticmethod
+    def assemble(shell: str, model: dict):
+        if model["title"] is not None:
+            shell = shell.replace(HtmlShell.TITLE_PLACEHOLDER, model["title"], 1)
+        return shell.replace(HtmlShell.MODEL_PLACEHOLDER, model["model"], 1)
+
+    @staticmethod
+    def read(path: str, shells_folder: str):
+        """rebuilds the page of a notebook saved as <path>.model.json, shells_folder being the folder of the shell files"""
+        with open(path+HtmlShell.MODEL_EXTENSION, "r") as f:
+            model = json.loads(f.read())
+        with open(f"{shells_folder}/{model['shell']}.html", "r") as f:
+            return HtmlShell.assemble(f.read(), model)
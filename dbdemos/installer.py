@@ -12,6 +12,9 @@ from .installer_genie import InstallerGenie
 from .installer_dashboard import InstallerDashboard
 from .tracker import Tracker
 from .notebook_parser import NotebookParser
+from .html_shell import HtmlShell
+from .bundle_pack import BundlePack
+from .uc_preflight import UnityCatalogPreflight
 from .installer_workflows import InstallerWorkflow
 from .installer_repos import InstallerRepo
 from pathlib import Path
@@ -25,8 +28,15 @@ import urllib
 import threading
 from dbdemos.sql_query import SQLQueryExecutor
 from databricks.sdk import WorkspaceClient
+from databricks.sdk.service.catalog import CatalogInfo
 
 class Installer:
+    #Results kept per cell when installing lite notebooks (see NotebookParser.cap_results)
+    LITE_MAX_ROWS = 10
+    LITE_MAX_RESULT_SIZE = 50000
+    #Notebooks packaged with capped results (see Packager max_result_rows), used by lite installs when the demo has a lite bundle
+    BUNDLES_FOLDERS = ["bundles", "bundles_lite"]
+
     def __init__(self, username = None, pat_token = None, workspace_url = None, cloud = "AWS", org_id: str = None, current_cluster_id: str = None):
         self.cloud = cloud
         self.dbutils = None
@@ -53,7 +63,26 @@ class Installer:
         #Slows down on GCP as the dashboard API is very sensitive to back-pressure
         # 1 dashboard at a time to reduce import pression as it seems to be creating new errors.
         self.max_workers = 1 if self.get_current_cloud() == "GCP" else 1
-
+        self.shells = {}
+        self.shells_lock = threading.Lock()
+        self.bundle_packs = {}
+        self.bundle_packs_lock = threading.Lock()
+        #Unity Catalog objects of the current install
+        self.uc_preflight = None
+
+
+    def get_uc_preflight(self):
+        if self.uc_preflight is None:
+            self.uc_preflight = UnityCatalogPreflight(WorkspaceClient(token=self.db.conf.pat_token, host=self.db.conf.workspace_url))
+        return self.uc_preflight
+
+    #catalog, schema and raw data volume of the demo are resolved at once.
+    #The genie tables are resolved after the data loading (see InstallerGenie.install_genies) as it can create them.
+    def run_uc_preflight(self, demo_conf: DemoConf):
+        if not demo_conf.catalog:
+            return
+        volume = InstallerGenie.VOLUME_NAME if len(demo_conf.data_folders) > 0 else None
+        self.get_uc_preflight().resolve(demo_conf.catalog, demo_conf.schema, volume)
 
     def get_dbutils(self):
         if self.dbutils is None:
@@ -206,11 +235,64 @@ class Installer:
         conf_template = ConfTemplate(self.db.conf.username, demo_name, catalog, schema, demo_folder)
         return DemoConf(demo_name, json.loads(conf_template.replace_template_key(demo)), catalog, schema)
 
+    #Bundles can be packaged as a single pack file (see BundlePack), None if the demo files are loose resources.
+    def get_demo_bundle_pack(self, demo_name, bundles_folder = "bundles"):
+        with self.bundle_packs_lock:
+            if (bundles_folder, demo_name) not in self.bundle_packs:
+                pack_path = f"{bundles_folder}/{demo_name}/{BundlePack.FILE_NAME}"
+                pack = None
+                if pkg_resources.resource_exists("dbdemos", pack_path):
+                    pack = BundlePack(pkg_resources.resource_filename("dbdemos", pack_path))
+                self.bundle_packs[(bundles_folder, demo_name)] = pack
+            return self.bundle_packs[(bundles_folder, demo_name)]
+
+    #Returns (pack, path in the pack) if the resource is in a bundle pack, (None, None) otherwise.
+    def get_bundle_pack(self, path):
+        parts = path.strip("/").split("/", 2)
+        if len(parts) < 3 or parts[0] not in Installer.BUNDLES_FOLDERS:
+            return None, None
+        pack = self.get_demo_bundle_pack(parts[1], parts[0])
+        if pack is None or not pack.exists(parts[2]):
+            return None, None
+        return pack, parts[2]
+
     def get_resource(self, path, decode=True):
-        resource = pkg_resources.resource_string("dbdemos", path)
+        pack, pack_path = self.get_bundle_pack(path)
+        if pack is not None:
+            resource = pack.read(pack_path)
+        else:
+            resource = pkg_resources.resource_string("dbdemos", path)
         return resource.decode('UTF-8') if decode else resource
+
+    def resource_exists(self, path):
+        return self.get_bundle_pack(path)[0] is not None or pkg_resources.resource_exists("dbdemos", path)
+
+    def resource_listdir(self, path):
+        resources = set(pkg_resources.resource_listdir("dbdemos", path)) if pkg_resources.resource_isdir("dbdemos", path) else set()
+        parts = path.strip("/").split("/", 2)
+        if len(parts) >= 2 and parts[0] in Installer.BUNDLES_FOLDERS:
+            pack = self.get_demo_bundle_pack(parts[1], parts[0])
+            if pack is not None:
+                resources.discard(BundlePack.FILE_NAME)
+                resources.update(pack.listdir(parts[2] if len(parts) > 2 else ""))
+        return resources
     
+    #Bundled notebooks only contain the notebook model, the html page is rebuilt from the shared viewer shell (see HtmlShell).
+    #Falls back to the full .html file for bundles packaged before the shell split.
+    def get_notebook_html(self, path):
+        if not self.resource_exists(path+HtmlShell.MODEL_EXTENSION):
+            return self.get_resource(path+".html")
+        model = json.loads(self.get_resource(path+HtmlShell.MODEL_EXTENSION))
+        with self.shells_lock:
+            if model["shell"] not in self.shells:
+                self.shells[model["shell"]] = self.get_resource(f"{HtmlShell.SHELL_FOLDER}/{model['shell']}.html")
+            shell = self.shells[model["shell"]]
+        return HtmlShell.assemble(shell, model)
+
     def resource_isdir(self, path):
+        pack, pack_path = self.get_bundle_pack(path)
+        if pack is not None:
+            return pack.isdir(pack_path)
         return pkg_resources.resource_isdir("dbdemos", path)
 
     def test_premium_pricing(self):
@@ -235,16 +317,17 @@ class Installer:
 
     def create_or_check_schema(self, demo_conf: DemoConf, create_schema: bool, debug=True):
         """Create or verify schema exists based on create_schema parameter"""
-        ws = WorkspaceClient(token=self.db.conf.pat_token, host=self.db.conf.workspace_url)
-        try:
-            catalog = ws.catalogs.get(demo_conf.catalog)
-        except Exception as e:
+        preflight = self.get_uc_preflight()
+        ws = preflight.ws
+        catalog, e = preflight.get(UnityCatalogPreflight.CATALOG, demo_conf.catalog)
+        if catalog is None:
             if create_schema:
                 if debug:
                     print(f"Can't describe catalog {demo_conf.catalog}. Will now try to create it. Error: {e}")
                 try:
                     print(f"Catalog {demo_conf.catalog} doesn't exist. Creating it. You can set create_schema=False to avoid catalog and schema creation, or install in another catalog with catalog=<catalog_name>.")
                     self.sql_query_executor.execute_query(ws, f"CREATE CATALOG IF NOT EXISTS {demo_conf.catalog}")
+                    preflight.set(UnityCatalogPreflight.CATALOG, demo_conf.catalog, CatalogInfo(name=demo_conf.catalog))
                     #note: ws.catalogs.create(demo_conf.catalog) this doesn't work properly in serverless workspaces with default storage for now (Metastore storage root URL does not exist error)
                 except Exception as e:
                     self.report.display_schema_creation_error(e, demo_conf)
@@ -252,14 +335,14 @@ class Installer:
                 self.report.display_schema_not_found_error(e, demo_conf)
 
         schema_full_name = f"{demo_conf.catalog}.{demo_conf.schema}"
-        try:
-            schema = ws.schemas.get(schema_full_name)
-        except Exception as e:
+        schema, e = preflight.get(UnityCatalogPreflight.SCHEMA, schema_full_name)
+        if schema is None:
             if create_schema:
                 if debug:
                     print(f"Can't describe schema {schema_full_name}. Will now try to create it. Error: {e}")
                 try:
                     schema = ws.schemas.create(demo_conf.schema, catalog_name=demo_conf.catalog)
+                    preflight.set(UnityCatalogPreflight.SCHEMA, schema_full_name, schema)
                 except Exception as e:
                     self.report.display_schema_creation_error(e, demo_conf)
             else:
@@ -267,7 +350,7 @@ class Installer:
 
     def install_demo(self, demo_name, install_path, overwrite=False, update_cluster_if_exists = True, skip_dashboards = False, start_cluster = None,
                      use_current_cluster = False, debug = False, catalog = None, schema = None, serverless=False, warehouse_name = None, skip_genie_rooms=False, 
-                     create_schema=True, dlt_policy_id = None, dlt_compute_settings = None):
+                     create_schema=True, dlt_policy_id = None, dlt_compute_settings = None, lite = False):
         # first get the demo conf.
         if install_path is None:
             install_path = self.get_current_folder()
@@ -291,6 +374,9 @@ class Installer:
             self.report.display_incorrect_schema_error(Exception('Please use a valid schema/catalog name.'), demo_conf)
 
         # Add schema validation/creation after demo_conf initialization
+        self.uc_preflight = None
+        if demo_conf.custom_schema_supported or len(demo_conf.data_folders) > 0 or len(demo_conf.genie_rooms) > 0:
+            self.run_uc_preflight(demo_conf)
         if demo_conf.custom_schema_supported:
             self.create_or_check_schema(demo_conf, create_schema, debug)
 
@@ -319,7 +405,7 @@ class Installer:
         init_job = self.installer_workflow.create_demo_init_job(demo_conf, use_cluster_id, warehouse_name, serverless, debug)
         all_workflows = workflows if init_job["id"] is None else workflows + [init_job]
         genie_rooms = self.installer_genie.install_genies(demo_conf, install_path, warehouse_name, skip_genie_rooms, debug)
-        notebooks = self.install_notebooks(demo_name, install_path, demo_conf, cluster_name, cluster_id, pipeline_ids, dashboards, all_workflows, repos, overwrite, use_current_cluster, genie_rooms, debug)
+        notebooks = self.install_notebooks(demo_name, install_path, demo_conf, cluster_name, cluster_id, pipeline_ids, dashboards, all_workflows, repos, overwrite, use_current_cluster, genie_rooms, debug, lite)
         self.installer_workflow.start_demo_init_job(demo_conf, init_job, debug)
         for pipeline in pipeline_ids:
             if "run_after_creation" in pipeline and pipeline["run_after_creation"]:
@@ -414,7 +500,7 @@ class Installer:
                 self.report.display_folder_permission(FolderDeletionException(install_path, d), demo_conf)
 
     def install_notebooks(self, demo_name: str, install_path: str, demo_conf: DemoConf, cluster_name: str, cluster_id: str,
-                          pipeline_ids, dashboards, workflows, repos, overwrite=False, use_current_cluster=False, genie_rooms = [], debug=False):
+                          pipeline_ids, dashboards, workflows, repos, overwrite=False, use_current_cluster=False, genie_rooms = [], debug=False, lite=False):
         assert len(demo_name) > 4, "wrong demo name. Fail to prevent potential delete errors."
         if debug:
             print(f'    Installing notebooks')
@@ -422,8 +508,11 @@ class Installer:
         folders_created = set()
         #Avoid multiple mkdirs in parallel as it's creating error.
         folders_created_lock = threading.Lock()
+        bundles_folder = "bundles"
+        if lite and self.resource_exists(f"bundles_lite/{demo_name}/conf.json"):
+            bundles_folder = "bundles_lite"
         def load_notebook(notebook):
-            return load_notebook_path(notebook, "bundles/"+demo_name+"/install_package/"+notebook.get_clean_path())
+            return load_notebook_path(notebook, bundles_folder+"/"+demo_name+"/install_package/"+notebook.get_clean_path())
 
         def load_notebook_path(notebook: DemoNotebook, template_path):
             parent = str(Path(install_path+"/"+notebook.get_clean_path()).parent)
@@ -447,13 +536,16 @@ class Installer:
                 if 'error_code' in r:
                     self.report.display_folder_creation_error(FolderCreationException(f"{install_path}/{notebook.get_clean_path()}", r), demo_conf)
             else:
-                html = self.get_resource(template_path+".html")
+                html = self.get_notebook_html(template_path)
                 parser = NotebookParser(html)
                 if notebook.add_cluster_setup_cell and not use_current_cluster:
                     self.add_cluster_setup_cell(parser, demo_name, cluster_name, cluster_id, self.db.conf.workspace_url)
                 parser.replace_dynamic_links_lakeview_dashboards(dashboards)
                 parser.replace_dynamic_links_genie(genie_rooms)
                 parser.remove_automl_result_links()
+                #also applied to the lite bundles: the results are already capped, unless they were packaged with larger caps
+                if lite:
+                    parser.cap_results(Installer.LITE_MAX_ROWS, Installer.LITE_MAX_RESULT_SIZE)
                 parser.replace_schema(demo_conf)
                 parser.replace_dynamic_links_pipeline(pipeline_ids)
                 parser.replace_dynamic_links_repo(repos)
@@ -1,5 +1,4 @@
 from .conf import DemoConf
-import pkg_resources
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -22,7 +21,7 @@ class InstallerDashboard:
                 return installed_dash
             except Exception as e:
                 self.installer.report.display_dashboard_error(e, demo_conf)
-        elif "dashboards" in pkg_resources.resource_listdir("dbdemos", "bundles/"+demo_conf.name):
+        elif "dashboards" in self.installer.resource_listdir("bundles/"+demo_conf.name):
             raise Exception("Old dashboard are not supported anymore. This shouldn't happen - please fill a bug")
         return []
 
@@ -1,4 +1,9 @@
+import hashlib
+import io
 import json
+import os
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from databricks.sdk import WorkspaceClient
 from databricks.sdk.service.catalog import VolumeType
@@ -6,6 +11,10 @@ from databricks.sdk.service.sql import StatementState
 
 from dbdemos.sql_query import SQLQueryExecutor
 from .conf import DataFolder, DemoConf, GenieRoom
+from .transfer_stream import TransferStream
+from .dataset_cache import DatasetCache
+from .dataset_manifest import DatasetManifest
+from .uc_preflight import UnityCatalogPreflight
 from .exceptions.dbdemos_exception import GenieCreationException, DataLoaderException, SQLQueryException
 
 from typing import TYPE_CHECKING
@@ -15,11 +24,26 @@ if TYPE_CHECKING:
 
 class InstallerGenie:
     VOLUME_NAME = "dbdemos_raw_data"
+    #sync state of the data folders (source sha of the loaded files), kept out of the data folders users and tools list
+    VOLUME_SYNC_FOLDER = ".dbdemos_sync"
+    #volume uploads: concurrent file transfers, download chunk size (memory used per transfer) and attempts per file
+    TRANSFER_WORKERS = 5
+    TRANSFER_CHUNK_SIZE = 1024*1024
+    TRANSFER_RETRIES = 3
+    #data folders are read from S3 by the warehouse, or staged in a volume when the warehouse can't access the bucket
+    DATA_LOADING_S3 = "S3"
+    DATA_LOADING_VOLUME = "VOLUME"
+    #loading mode probed per (workspace, warehouse)
+    _data_loading_modes = {}
+    _data_loading_modes_lock = threading.Lock()
+    #one lock per (workspace, warehouse): the probe can wait for a cold warehouse without blocking the other installs
+    _data_loading_mode_probe_locks = {}
 
     def __init__(self, installer: 'Installer'):
         self.installer = installer
         self.db = installer.db
         self.sql_query_executor = SQLQueryExecutor()
+        self.dataset_cache = DatasetCache()
 
     def install_genies(self, demo_conf: DemoConf, install_path: str, warehouse_name: str, skip_genie_rooms: bool, debug=True):
         rooms = []
@@ -31,6 +55,8 @@ class InstallerGenie:
                 if not skip_genie_rooms and len(demo_conf.genie_rooms) > 0:
                     if debug:
                         print(f"Installing genie room {demo_conf.genie_rooms}")
+                    #the data loading can create the tables: resolved after it, all at once
+                    self.installer.get_uc_preflight().resolve(tables=[t for room in demo_conf.genie_rooms for t in room.table_identifiers], refresh=True)
                     genie_path = f"{install_path}/{demo_conf.name}/_genie_spaces"
                     #Make sure the genie folder exists
                     self.db.post("2.0/workspace/mkdirs", {"path": genie_path})
@@ -92,29 +118,37 @@ class InstallerGenie:
     # we need to have the table existing before creating the genie room, however they're created in DLT which is in a job and not yet available.
     # This is a workaround to create a temp table with a property that will be used to delete it once the genie room is created so that the DLT table can run without issue.
     def create_temp_table_for_genie_creation(self, ws: WorkspaceClient, room: GenieRoom, warehouse_id, debug=False):
+        preflight = self.installer.get_uc_preflight()
         for table in room.table_identifiers:
-            if not ws.tables.exists(table).table_exists:
+            if not preflight.exists(UnityCatalogPreflight.TABLE, table):
                 sql_query = f"CREATE TABLE IF NOT EXISTS {table} TBLPROPERTIES ('dbdemos.mock_table_for_genie' = 1);"
                 if debug:
                     print(f"Creating temp genie table {table}: {sql_query}")
                 self.sql_query_executor.execute_query(ws, sql_query, warehouse_id=warehouse_id, debug=debug)
+                #read back: the table properties tell if it's our temp table when deleting it
+                preflight.resolve(tables=[table], refresh=True)
 
     def delete_temp_table_for_genie_creation(self, ws, room: GenieRoom, debug=False):
+        preflight = self.installer.get_uc_preflight()
         for table in room.table_identifiers:
-            if ws.tables.exists(table).table_exists and 'dbdemos.mock_table_for_genie' in ws.tables.get(table).properties:
+            table_info, _ = preflight.get(UnityCatalogPreflight.TABLE, table)
+            if table_info is not None and 'dbdemos.mock_table_for_genie' in (table_info.properties or {}):
                 if debug:
                     print(f'Deleting temp genie table {table}')
                 ws.tables.delete(table)
+                preflight.set(UnityCatalogPreflight.TABLE, table, None)
 
     def load_genie_data(self, demo_conf: DemoConf, warehouse_id, debug=True):
         if demo_conf.data_folders:
             print(f"Loading data in your schema {demo_conf.catalog}.{demo_conf.schema} using warehouse {warehouse_id}, this might take a few seconds (you can use another warehouse with the option: warehouse_name='xxx')...")
             ws = WorkspaceClient(token=self.installer.db.conf.pat_token, host=self.installer.db.conf.workspace_url)
-            if any(d.target_volume_folder_name is not None for d in demo_conf.data_folders):
+            table_folders = [d for d in demo_conf.data_folders if d.target_table_name]
+            mode = self.get_data_loading_mode(ws, table_folders[0], warehouse_id, debug) if len(table_folders) > 0 else InstallerGenie.DATA_LOADING_S3
+            if mode == InstallerGenie.DATA_LOADING_VOLUME or any(d.target_volume_folder_name is not None for d in demo_conf.data_folders):
                 self.create_raw_data_volume(ws, demo_conf, debug)
 
             with ThreadPoolExecutor(max_workers=3) as executor:
-                futures = [executor.submit(self.load_data, ws, data_folder, warehouse_id, demo_conf, debug) 
+                futures = [executor.submit(self.load_data, ws, data_folder, warehouse_id, demo_conf, debug, mode) 
                         for data_folder in demo_conf.data_folders]
                 for future in futures:
                     future.result()
@@ -132,9 +166,55 @@ class InstallerGenie:
     def get_current_cluster_id(self):
         return json.loads(self.installer.get_dbutils_tags_safe()['clusterId'])
 
-    def load_data(self, ws: WorkspaceClient, data_folder: DataFolder, warehouse_id, conf: DemoConf, debug=True):
+    #Probes once per workspace & warehouse if the warehouse can read our S3 bucket, so that all the folders use the right loading path.
+    def get_data_loading_mode(self, ws: WorkspaceClient, data_folder: DataFolder, warehouse_id, debug=True):
+        key = (self.db.conf.workspace_url, warehouse_id)
+        with InstallerGenie._data_loading_modes_lock:
+            probe_lock = InstallerGenie._data_loading_mode_probe_locks.setdefault(key, threading.Lock())
+        #concurrent installs on the same warehouse wait for the first probe
+        with probe_lock:
+            with InstallerGenie._data_loading_modes_lock:
+                if key in InstallerGenie._data_loading_modes:
+                    return InstallerGenie._data_loading_modes[key]
+            mode = self.probe_data_loading_mode(ws, data_folder, warehouse_id, debug)
+            #inconclusive probe: try S3 first, load_data falls back to the volume if needed
+            if mode is None:
+                return InstallerGenie.DATA_LOADING_S3
+            with InstallerGenie._data_loading_modes_lock:
+                return InstallerGenie._data_loading_modes.setdefault(key, mode)
+
+    def set_data_loading_mode(self, warehouse_id, mode):
+        with InstallerGenie._data_loading_modes_lock:
+            InstallerGenie._data_loading_modes[(self.db.conf.workspace_url, warehouse_id)] = mode
+
+    #Reads one row of the smallest file of the folder
+    def probe_data_loading_mode(self, ws: WorkspaceClient, data_folder: DataFolder, warehouse_id, debug=True):
+        path = data_folder.source_folder
+        try:
+            files = DatasetManifest.get().list_files(data_folder.source_folder)
+            if len(files) > 0:
+                path = min(files, key=lambda f: f['size'])['path']
+        except Exception as e:
+            print(f"WARN: couldn't get the dataset manifest, probing the folder {path}: {e}")
+        sql_query = f"SELECT * FROM read_files('s3://dbdemos-dataset/{path}', format => '{data_folder.source_format}') LIMIT 1"
+        if debug:
+            print(f"Probing S3 access from the warehouse: {sql_query}")
+        try:
+            self.sql_query_executor.execute_query(ws, sql_query, warehouse_id=warehouse_id, debug=debug)
+            return InstallerGenie.DATA_LOADING_S3
+        except Exception as e:
+            if "com.amazonaws.auth.BasicSessionCredentials" in str(e):
+                print("INFO: Basic Credential error detected reading our demo bucket. Data will be loaded to a volume first, please wait as this is a slower workflow...")
+                return InstallerGenie.DATA_LOADING_VOLUME
+            print(f"WARN: couldn't probe S3 access from the warehouse: {e}")
+            return None
+
+    def load_data(self, ws: WorkspaceClient, data_folder: DataFolder, warehouse_id, conf: DemoConf, debug=True, mode = DATA_LOADING_S3):
         # Load table to a table
-        if data_folder.target_table_name:
+        if data_folder.target_table_name and mode == InstallerGenie.DATA_LOADING_VOLUME:
+            self.load_data_to_volume(ws, data_folder, conf, debug)
+            self.create_table_from_volume(ws, data_folder, warehouse_id, conf, debug)
+        elif data_folder.target_table_name:
             try:
                 sql_query = f"""CREATE TABLE IF NOT EXISTS {conf.catalog}.{conf.schema}.{data_folder.target_table_name} as 
                             SELECT * FROM read_files('s3://dbdemos-dataset/{data_folder.source_folder}',  
@@ -146,6 +226,7 @@ class InstallerGenie:
             except Exception as e:
                 if "com.amazonaws.auth.BasicSessionCredentials" in str(e):
                     print("INFO: Basic Credential error detected downloading the files from our demo bucket. Will try to load data to volume first, please wait as this is a slower workflow...")
+                    self.set_data_loading_mode(warehouse_id, InstallerGenie.DATA_LOADING_VOLUME)
                     self.create_raw_data_volume(ws, conf, debug)
                     self.load_data_to_volume(ws, data_folder, conf, debug)
                     self.create_table_from_volume(ws, data_folder, warehouse_id, conf, debug)
@@ -159,20 +240,27 @@ class InstallerGenie:
     _volume_creation_lock = threading.Lock()
 
     def create_raw_data_volume(self, ws: WorkspaceClient, demo_conf: DemoConf, debug=True):
+        preflight = self.installer.get_uc_preflight()
+        volume_name = f"{demo_conf.catalog}.{demo_conf.schema}.{InstallerGenie.VOLUME_NAME}"
+        #resolved by the install preflight, the lock is only needed to create it
+        if preflight.exists(UnityCatalogPreflight.VOLUME, volume_name):
+            return
         with InstallerGenie._volume_creation_lock:
             full_volume_name = f"{demo_conf.catalog}/{demo_conf.schema}/{InstallerGenie.VOLUME_NAME}"
-            try:
-                ws.volumes.read(f"{demo_conf.catalog}.{demo_conf.schema}.{InstallerGenie.VOLUME_NAME}")
-            except Exception as e:
+            #the volume might have been created by another install since the preflight
+            preflight.resolve(demo_conf.catalog, demo_conf.schema, InstallerGenie.VOLUME_NAME, refresh=True)
+            volume, e = preflight.get(UnityCatalogPreflight.VOLUME, volume_name)
+            if volume is None:
                 if debug:
                     print(f"Volume {full_volume_name} doesn't seem to exist, creating it - {e}")
                 try:
-                    ws.volumes.create(
+                    volume = ws.volumes.create(
                         catalog_name=demo_conf.catalog,
                         schema_name=demo_conf.schema,
                         name=InstallerGenie.VOLUME_NAME,
                         volume_type=VolumeType.MANAGED
                     )
+                    preflight.set(UnityCatalogPreflight.VOLUME, volume_name, volume)
                 except Exception as e:  
                     raise DataLoaderException(f"Can't create volume {full_volume_name} to load data demo, and it doesn't seem to be existing. <br/>"
                                             f"Please create the volume or grant you USAGE/READ permission, or install the demo in another catalog: dbdemos.install(xxx, catalog=xxx, schema=xxx, warehouse_id=xx).<br/>"
@@ -197,48 +285,124 @@ class InstallerGenie:
                 future.result()
 
 
-    def load_data_to_volume(self, ws: WorkspaceClient, data_folder: DataFolder, demo_conf: DemoConf, debug=True):
+    #sync: only transfer the files missing or changed in the volume (from a previous install in the same schema)
+    def load_data_to_volume(self, ws: WorkspaceClient, data_folder: DataFolder, demo_conf: DemoConf, debug=True, sync=True):
         assert data_folder.source_format in ["csv", "json", "parquet"], "data loader through volume only support csv, json and parquet"
 
-        import requests
-        import collections
         try:
-            # Get list of files from GitHub API, to avoid adding a S3 boto dependency just for this
-            github_path = f"https://api.github.com/repos/databricks-demos/dbdemos-dataset/contents/{data_folder.source_folder}"
-            if debug:
-                print(f"Getting files from {github_path}")
-            files = requests.get(github_path).json()
-            if 'message' in files:
-                print(f"Error getting files from {github_path}: {files}")
-            files = [f['download_url'] for f in files]
-            
+            # Files from the dataset manifest, to avoid adding a S3 boto dependency just for this
+            files = DatasetManifest.get().list_files(data_folder.source_folder)
+            if len(files) == 0:
+                print(f"WARN: no file found in the dataset manifest for {data_folder.source_folder}")
             if debug:
-                print(f"Found {len(files)} files in GitHub repo for {data_folder.source_folder}")
-                            
-            def copy_file(file_url):
-                if not file_url.endswith('/'):
-                    file_name = file_url.split('/')[-1]
-                    folder = data_folder.target_volume_folder_name if data_folder.target_volume_folder_name else data_folder.source_folder
-                    target_path = f"/Volumes/{demo_conf.catalog}/{demo_conf.schema}/{InstallerGenie.VOLUME_NAME}/{folder}/{file_name}"
-                    
-                    s3_url = file_url.replace("https://raw.githubusercontent.com/databricks-demos/dbdemos-dataset/main/", 
-                                            "https://dbdemos-dataset.s3.amazonaws.com/")
-                    if debug:
-                        print(f"Copying {s3_url} to {target_path}")
-                    response = requests.get(s3_url)
-                    response.raise_for_status()
-                    if debug:
-                        print(f"File {file_name} in memory. sending to volume...")
-                    ws.files.upload(target_path, response.content, overwrite=True)
-                    if debug:
-                        print(f"File {file_name} in volume!")
-            
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                collections.deque(executor.map(copy_file, files))
+                print(f"Found {len(files)} files in the dataset manifest for {data_folder.source_folder}")
+
+            folder = data_folder.target_volume_folder_name if data_folder.target_volume_folder_name else data_folder.source_folder
+            volume_root = f"/Volumes/{demo_conf.catalog}/{demo_conf.schema}/{InstallerGenie.VOLUME_NAME}"
+            volume_folder = f"{volume_root}/{folder}"
+            #the volume folder is listed once, instead of checking each file
+            volume_files = self.list_volume_folder(ws, volume_folder) if sync else {}
+            manifest = self.read_volume_manifest(ws, volume_root, folder) if sync else {}
+
+            #returns (bytes transferred, file size, sha of the file in the volume)
+            def copy_file(file):
+                file_name = file['name']
+                previous_sha = manifest.get(file_name, {}).get('sha', None)
+                #same content as the source (git blob sha) and complete in the volume. A file with the same size only might have changed.
+                if previous_sha == file['sha'] and volume_files.get(file_name) == manifest[file_name]['size']:
+                    return 0, manifest[file_name]['size'], previous_sha
+                transferred, size = self.transfer_file(ws, DatasetManifest.get_url(file['path']), f"{volume_folder}/{file_name}", debug, file)
+                return transferred, size, file['sha']
+
+            start_time = time.time()
+            with ThreadPoolExecutor(max_workers=InstallerGenie.TRANSFER_WORKERS) as executor:
+                results = list(executor.map(copy_file, files))
+            transferred = sum(r[0] for r in results)
+            skipped = len([r for r in results if r[0] == 0])
+            duration = max(time.time() - start_time, 0.001)
+            print(f"Loaded {len(files)-skipped} files ({transferred/1024/1024:.1f}MB) from {data_folder.source_folder} to the volume in {duration:.1f}s ({transferred/1024/1024/duration:.1f}MB/s), {skipped} unchanged files skipped")
+            self.write_volume_manifest(ws, volume_root, folder, {f['name']: {"sha": r[2], "size": r[1]} for f, r in zip(files, results)})
 
         except Exception as e:
             raise DataLoaderException(f"Error loading data from S3: {str(e)}")
 
+    #Copies the file from the url to the volume. The file is downloaded once to the local dataset cache, then uploaded
+    #from the file on disk: the upload source is seekable, so the SDK retries transient upload errors from the cached file
+    #instead of downloading it again. Without cache, the download is streamed to the upload (one chunk in memory, no SDK retry).
+    #source_file: optional manifest entry ({"size", "sha"}) to check the integrity of the transferred content
+    #returns (bytes transferred, file size)
+    def transfer_file(self, ws: WorkspaceClient, url: str, target_path: str, debug=True, source_file: dict = None):
+        import requests
+        file_name = target_path.split('/')[-1]
+        for attempt in range(InstallerGenie.TRANSFER_RETRIES):
+            try:
+                with requests.get(url, stream=True, timeout=60) as response:
+                    response.raise_for_status()
+                    length = int(response.headers['Content-Length']) if 'Content-Length' in response.headers else None
+                    if debug:
+                        print(f"Copying {url} to {target_path}")
+                    #git blob sha of the content, only when the manifest describes this version of the file
+                    checksum = None
+                    if source_file is not None and source_file['size'] == length:
+                        checksum = hashlib.sha1(f"blob {length}\0".encode('utf-8'))
+                    start_time = time.time()
+                    if self.dataset_cache is None:
+                        stream = TransferStream(response.iter_content(InstallerGenie.TRANSFER_CHUNK_SIZE), length, checksum)
+                        ws.files.upload(target_path, stream, overwrite=True)
+                        size = stream.position
+                    else:
+                        #other installs on this driver reuse the file from the local disk
+                        def download(path):
+                            with open(path, "wb") as f:
+                                for chunk in response.iter_content(InstallerGenie.TRANSFER_CHUNK_SIZE):
+                                    f.write(chunk)
+                        cache_key = DatasetCache.get_dataset_key(url, response.headers.get('ETag', None), length)
+                        #the entry can't be evicted by the other transfers until it's uploaded
+                        with self.dataset_cache.use_entry(cache_key, download) as cached_path:
+                            if checksum is not None:
+                                #checked before the upload, a corrupted entry is downloaded again by the next attempt
+                                with open(cached_path, "rb") as f:
+                                    for chunk in iter(lambda: f.read(InstallerGenie.TRANSFER_CHUNK_SIZE), b""):
+                                        checksum.update(chunk)
+                                if checksum.hexdigest() != source_file['sha']:
+                                    os.remove(cached_path)
+                                    raise Exception(f"checksum mismatch for {file_name}: {checksum.hexdigest()} instead of {source_file['sha']}")
+                            size = os.path.getsize(cached_path)
+                            with open(cached_path, "rb") as f:
+                                ws.files.upload(target_path, f, overwrite=True)
+                if checksum is not None and checksum.hexdigest() != source_file['sha']:
+                    raise Exception(f"checksum mismatch for {file_name}: {checksum.hexdigest()} instead of {source_file['sha']}")
+                if debug:
+                    duration = max(time.time() - start_time, 0.001)
+                    print(f"File {file_name} in volume! {size/1024/1024:.1f}MB at {size/duration/1024/1024:.1f}MB/s")
+                return size, size
+            except Exception as e:
+                if attempt == InstallerGenie.TRANSFER_RETRIES - 1:
+                    raise DataLoaderException(f"Error transferring {url} to {target_path}: {str(e)}")
+                print(f"WARN: transfer of {file_name} failed, retrying ({attempt+1}/{InstallerGenie.TRANSFER_RETRIES}): {e}")
+                time.sleep(2 ** attempt)
+
+    #returns the size of the files in the volume folder, by name (empty if the folder doesn't exist)
+    def list_volume_folder(self, ws: WorkspaceClient, folder: str):
+        try:
+            return {f.name: f.file_size for f in ws.files.list_directory_contents(folder) if not f.is_directory}
+        except Exception:
+            return {}
+    #The manifest keeps the source sha of the files loaded in each volume folder. It is saved under a hidden folder at the volume root, outside of the data folders.
+    #The manifest keeps the source sha of the files loaded in the volume folder. Spark ignores files starting with _ when reading the folder.
+    def get_volume_manifest_path(self, volume_root: str, folder: str):
+        return f"{volume_root}/{InstallerGenie.VOLUME_SYNC_FOLDER}/{folder.strip('/')}.json"
+
+    def read_volume_manifest(self, ws: WorkspaceClient, volume_root: str, folder: str):
+        try:
+            with ws.files.download(self.get_volume_manifest_path(volume_root, folder)).contents as f:
+                return json.loads(f.read())
+        except Exception:
+            return {}
+
+    def write_volume_manifest(self, ws: WorkspaceClient, volume_root: str, folder: str, manifest: dict):
+        ws.files.upload(self.get_volume_manifest_path(volume_root, folder), io.BytesIO(json.dumps(manifest).encode('utf-8')), overwrite=True)
+
     def create_table_from_volume(self, ws: WorkspaceClient, data_folder: DataFolder, warehouse_id, conf: DemoConf, debug=True):
         self.sql_query_executor.execute_query(ws, f"""CREATE TABLE IF NOT EXISTS {conf.catalog}.{conf.schema}.{data_folder.target_table_name} as 
                                             SELECT * FROM read_files('/Volumes/{conf.catalog}/{conf.schema}/{InstallerGenie.VOLUME_NAME}/{data_folder.source_folder}',  
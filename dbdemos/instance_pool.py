@@ -0,0 +1,101 @@
+import threading
+
+from .conf import DBClient
+
+
+class InstancePoolManager:
+    """
+    Resolves (or creates) the dbdemos instance pool of the workspace: our internal org pool if the workspace has one
+    (see Conf.get_org_demo_pool), otherwise the pool tagged with project=dbdemos.
+    Demo and test job clusters started from the pool reuse its warm instances instead of cold-starting VMs.
+    """
+    POOL_TAGS = {"project": "dbdemos"}
+    #same node types as resources/default_cluster_config-<cloud>.json
+    NODE_TYPES = {"AWS": "i3.xlarge", "AZURE": "Standard_D8ds_v4", "GCP": "n1-standard-8"}
+    IDLE_INSTANCE_AUTOTERMINATION_MINUTES = 30
+    MAX_IDLE_INSTANCES = 20
+
+    def __init__(self, db: DBClient, cloud: str = None):
+        self.db = db
+        #the installer cloud can be user-defined (ex: "Azure")
+        self.cloud = cloud.upper() if cloud is not None else InstancePoolManager.get_cloud(db.conf.workspace_url)
+        self.pool = None
+        self.pool_lock = threading.Lock()
+
+    @staticmethod
+    def get_cloud(workspace_url: str):
+        if "azuredatabricks.net" in workspace_url:
+            return "AZURE"
+        elif "gcp.databricks.com" in workspace_url:
+            return "GCP"
+        return "AWS"
+
+    #Idle instances for the jobs running at the same time: one per job cluster driver
+    @staticmethod
+    def get_min_idle_instances(job_count: int, max_running_jobs: int = None):
+        if max_running_jobs is not None:
+            job_count = min(job_count, max_running_jobs)
+        return min(job_count, InstancePoolManager.MAX_IDLE_INSTANCES)
+
+    #None if the cloud is unknown: clusters start without pool
+    def get_node_type(self):
+        return self.NODE_TYPES.get(self.cloud)
+
+    def get_pool_name(self):
+        return f"dbdemos-pool-{self.get_node_type()}"
+
+    def find_pool(self):
+        #adopt the existing internal pool instead of creating a new one next to it
+        org_pool_id = self.db.conf.get_org_demo_pool()
+        if org_pool_id is not None:
+            pool = self.db.get("2.0/instance-pools/get", {"instance_pool_id": org_pool_id}, print_auth_error=False)
+            if "instance_pool_id" in pool:
+                return pool
+            print(f"WARN: internal pool {org_pool_id} not found, using the dbdemos pool instead: {pool}")
+        pools = self.db.get("2.0/instance-pools/list", print_auth_error=False)
+        for pool in pools.get("instance_pools", []):
+            if pool.get("instance_pool_name") == self.get_pool_name() and \
+                    all(pool.get("custom_tags", {}).get(k) == v for k, v in self.POOL_TAGS.items()):
+                return pool
+        return None
+
+    #Returns the pool id, or None if the pool can't be created (ex: missing permission) and clusters should start without pool.
+    #The pool is only resized when min_idle_instances is set.
+    def get_or_create_pool(self, min_idle_instances: int = None):
+        if self.get_node_type() is None:
+            print(f"WARN: unknown cloud {self.cloud}, clusters will start without pool")
+            return None
+        with self.pool_lock:
+            if self.pool is None:
+                self.pool = self.find_pool()
+                if self.pool is None:
+                    pool = {"instance_pool_name": self.get_pool_name(),
+                            "node_type_id": self.get_node_type(),
+                            "min_idle_instances": min_idle_instances if min_idle_instances is not None else 0,
+                            "idle_instance_autotermination_minutes": self.IDLE_INSTANCE_AUTOTERMINATION_MINUTES,
+                            "custom_tags": self.POOL_TAGS}
+                    r = self.db.post("2.0/instance-pools/create", pool)
+                    if 'instance_pool_id' not in r:
+                        print(f"WARN: couldn't create the dbdemos instance pool, clusters will start without pool: {r}")
+                        return None
+                    print(f"created instance pool {pool['instance_pool_name']} - {r['instance_pool_id']}")
+                    self.pool = {**pool, "instance_pool_id": r['instance_pool_id']}
+        if min_idle_instances is not None:
+            self.set_min_idle_instances(min_idle_instances)
+        return self.pool["instance_pool_id"]
+
+    def set_min_idle_instances(self, min_idle_instances: int):
+        with self.pool_lock:
+            if self.pool is None or self.pool.get("min_idle_instances", 0) == min_idle_instances:
+                return
+            r = self.db.post("2.0/instance-pools/edit", {"instance_pool_id": self.pool["instance_pool_id"],
+                                                         "instance_pool_name": self.pool["instance_pool_name"],
+                                                         "node_type_id": self.pool["node_type_id"],
+                                                         "min_idle_instances": min_idle_instances,
+                                                         "idle_instance_autotermination_minutes": self.pool.get("idle_instance_autotermination_minutes", self.IDLE_INSTANCE_AUTOTERMINATION_MINUTES),
+                                                         #settings of adopted pools the edit would otherwise reset
+                                                         **{k: self.pool[k] for k in ["max_capacity", "custom_tags"] if k in self.pool}})
+            if 'error_code' in r:
+                print(f"WARN: couldn't resize the dbdemos instance pool {self.pool['instance_pool_id']}: {r}")
+            else:
+                self.pool["min_idle_instances"] = min_idle_instances
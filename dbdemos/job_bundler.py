@@ -1,19 +1,67 @@
 from .conf import DBClient, DemoConf, Conf, ConfTemplate, merge_dict
+from .export_cache import ExportCache
+from .path_trie import PathTrie
+from .instance_pool import InstancePoolManager
+from .bundle_config import BundleConfig
 import time
 import json
 import re
 import base64
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import collections
 import requests
+import threading
+import subprocess
+import os
 
 class JobBundler:
-    def __init__(self, conf: Conf):
+    #Run life cycle states of a run still running (or about to)
+    ACTIVE_STATES = ["PENDING", "QUEUED", "BLOCKED", "RUNNING", "TERMINATING"]
+    DEFAULT_JOB_DURATION = 30*60*1000
+    #upper bound when the job cluster is scaled up for the parallel tasks of the job
+    MAX_JOB_CLUSTER_WORKERS = 20
+    #the github compare api doesn't return more files
+    GITHUB_COMPARE_MAX_FILES = 300
+    #files listed for a single commit, by pages of 300
+    GITHUB_COMMIT_MAX_FILES = 3000
+
+    #cache_folder keeps the bundles found & their parsed config per repo head commit, and the job durations (None to disable)
+    #list_workers is the max number of concurrent workspace list calls when scanning the repo
+    #local_repo_path: optional local git clone of the demo repo, used to get the changed files without calling github
+    #max_running_jobs caps the number of bundle jobs (job clusters) running at the same time (None for no limit)
+    def __init__(self, conf: Conf, cache_folder: str = ".dbdemos_cache", list_workers: int = 10, local_repo_path: str = None, max_running_jobs: int = None):
         self.bundles = {}
         self.staging_reseted = False
+        self.staging_reset_lock = threading.RLock()
         self.head_commit_id = None
         self.conf = conf
         self.db = DBClient(conf)
+        self.list_workers = list_workers
+        self.local_repo_path = local_repo_path
+        #changed files per (owner, repo, base commit, last commit): most demos share the same base commit
+        self.changed_files = {}
+        self.changed_files_lock = threading.Lock()
+        self.cache = ExportCache(cache_folder+"/bundles") if cache_folder is not None else None
+        if self.cache is not None:
+            #entries from the previous runs only: nothing is read from the cache yet
+            self.cache.evict()
+        self.cache_folder = cache_folder
+        self.max_running_jobs = max_running_jobs
+        self.job_durations = None
+        self.job_durations_lock = threading.Lock()
+        #jobs planned by run_bundle_jobs and not started yet (max_running_jobs reached), and the runs started which aren't completed
+        self.pending_jobs = []
+        self.running_jobs = {}
+        #job tasks per demo, the %run references are read from the staging repo
+        self.bundle_tasks = {}
+        self.bundle_tasks_lock = threading.Lock()
+        self.pool_manager = InstancePoolManager(self.db)
+
+    #The repo content is immutable for a given head commit
+    def get_cached(self, fetch, *key):
+        if self.cache is None or self.head_commit_id is None:
+            return fetch()
+        return self.cache.get_or_fetch(ExportCache.get_key(*key, self.head_commit_id), fetch)
 
     def get_cluster_conf(self, demo_conf: DemoConf):
         conf_template = ConfTemplate(self.conf.username, demo_conf.name)
@@ -28,28 +76,31 @@ class JobBundler:
         #if not self.staging_reseted:
         #    self.reset_staging_repo()
         print("scanning folder for bundles...")
-        from threading import Lock
-
-        bundle_set = set()
-        bundle_lock = Lock()
-
-        def find_conf_files(path, depth = 0):
-            objects = self.db.get("2.0/workspace/list", {"path": path})
-            if "objects" not in objects:
-                return
-            objects = objects["objects"]
-            with ThreadPoolExecutor(max_workers=3 if depth <= 2 else 1) as executor:
-                params = [(o['path'], depth+1) for o in objects if o['object_type'] == 'DIRECTORY']
-                for _ in executor.map(lambda args, f=find_conf_files: f(*args), params):
-                    pass
-                for o in objects:
-                    if o['object_type'] == 'NOTEBOOK' and o['path'].endswith("/bundle_config"):
-                        with bundle_lock:
-                            bundle_set.add(o['path'])
-
-        find_conf_files(self.conf.get_repo_path())
+        bundle_set = json.loads(self.get_cached(lambda: json.dumps(self.find_bundle_configs()).encode('utf-8'), self.conf.get_repo_path(), "bundle_configs"))
+        #all the configs are loaded, then the errors are reported at once
         with ThreadPoolExecutor(max_workers=5) as executor:
-            collections.deque(executor.map(self.add_bundle_from_config, bundle_set))
+            futures = [executor.submit(self.add_bundle_from_config, c) for c in bundle_set]
+        errors = [str(f.exception()) for f in futures if f.exception() is not None]
+        if len(errors) > 0:
+            raise Exception(f"{len(errors)} bundle config(s) couldn't be loaded:\n" + "\n".join(errors))
+
+    #Breadth-first scan of the repo, with all the folders listed through the same pool (list_workers concurrent calls)
+    def find_bundle_configs(self):
+        bundle_configs = []
+        with ThreadPoolExecutor(max_workers=self.list_workers) as executor:
+            pending = {executor.submit(self.db.get, "2.0/workspace/list", {"path": self.conf.get_repo_path()})}
+            while len(pending) > 0:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    objects = future.result()
+                    if "objects" not in objects:
+                        continue
+                    for o in objects["objects"]:
+                        if o['object_type'] == 'DIRECTORY':
+                            pending.add(executor.submit(self.db.get, "2.0/workspace/list", {"path": o['path']}))
+                        elif o['object_type'] == 'NOTEBOOK' and o['path'].endswith("/bundle_config"):
+                            bundle_configs.append(o['path'])
+        return sorted(bundle_configs)
 
     def add_bundle_from_config(self, bundle_config_paths):
         #Remove the /Repos/xxx from the path (we need it from the repo root)
@@ -64,46 +115,48 @@ class JobBundler:
             self.add_bundle(path)
 
     def add_bundle(self, bundle_path, config_path: str = "_resources/bundle_config"):
-        if not self.staging_reseted:
-            self.reset_staging_repo()
+        self.reset_staging_repo_once()
         #Let's get the demo conf from the demo folder.
         config_path = self.conf.get_repo_path()+"/"+bundle_path+"/"+config_path
-
-        file = self.db.get("2.0/workspace/export", {"path": config_path, "format": "SOURCE", "direct_download": False})
-        if "content" not in file:
-            raise Exception(f"Couldn't download bundle file: {config_path}. Check your bundle path if you added it manualy.")
-        content = base64.b64decode(file['content']).decode('utf8')
-        #TODO not great, we can't download a file so need to use a notebook. We could use eval() to eval the cell but it's not super safe.
-        #Need to wait for file support via api (Q3)
-        lines = [l for l in content.split('\n') if not l.startswith("#") and len(l) > 0]
-        j = "\n".join(lines)
-        j = re.sub(r'[:\s*]True', ' true', j)
-        j = re.sub(r'[:\s*]False', ' false', j)
-        
-        # Handle triple-quoted multi-line strings by converting them to valid JSON strings
-        pattern = r'"""([\s\S]*?)"""'
-        
-        def replace_multiline(match):
-            # Get the content of the multi-line string
-            string_content = match.group(1)
-            # Escape newlines and other special characters for JSON
-            escaped = json.dumps(string_content)
-            # Return the escaped string (without the outer quotes that dumps adds)
-            return escaped
-        
-        j = re.sub(pattern, replace_multiline, j)
-        
-        try:
-            json_conf = json.loads(j)
-        except Exception as e:
-            raise Exception(f"incorrect json setting for {config_path}: {e}. The cell should contain a python object. Please use double quote.\n {j}")
+        json_conf = self.load_bundle_config(config_path)
         demo_conf = DemoConf(bundle_path, json_conf)
         if not demo_conf.bundle:
             print(f'SKIPPING DEMO {demo_conf.name} as it is not flagged for bundle.')
         else:
             self.bundles[bundle_path] = demo_conf
 
+    #The config is parsed once per content: re-scanning an unchanged config doesn't parse it again
+    def load_bundle_config(self, config_path):
+        def fetch():
+            file = self.db.get("2.0/workspace/export", {"path": config_path, "format": "SOURCE", "direct_download": False})
+            if "content" not in file:
+                raise Exception(f"Couldn't download bundle file: {config_path}. Check your bundle path if you added it manualy.")
+            return base64.b64decode(file['content'])
+        content = self.get_cached(fetch, config_path, "bundle_config_source")
+        def parse():
+            json_conf = BundleConfig.parse(content.decode('utf8'), config_path)
+            errors = BundleConfig.validate(json_conf)
+            if len(errors) > 0:
+                raise Exception(f"invalid bundle config {config_path}: " + ", ".join(errors))
+            return json.dumps(json_conf).encode('utf-8')
+        if self.cache is None:
+            return json.loads(parse())
+        return json.loads(self.cache.get_or_fetch(ExportCache.get_key("bundle_config", content), parse))
+
+    #add_bundle / package_demo run in thread pools: the first caller pulls the staging repo, the others wait for it
+    #and share the same head commit instead of pulling the whole repo again.
+    def reset_staging_repo_once(self):
+        if self.staging_reseted:
+            return
+        with self.staging_reset_lock:
+            if not self.staging_reseted:
+                self.reset_staging_repo()
+
     def reset_staging_repo(self, skip_pull = False):
+        with self.staging_reset_lock:
+            self._reset_staging_repo(skip_pull)
+
+    def _reset_staging_repo(self, skip_pull = False):
         repo_path = self.conf.get_repo_path()
         print(f"Cloning repo { self.conf.repo_url} and pulling last content under {repo_path}...")
         repos = self.db.get("2.0/repos", {"path_prefix": repo_path})
@@ -129,6 +182,7 @@ class JobBundler:
         self.wait_for_bundle_jobs_completion()
 
     def create_or_update_bundle_jobs(self, recreate_jobs: bool = False):
+        self.conf.demo_pool_id = self.pool_manager.get_or_create_pool()
         with ThreadPoolExecutor(max_workers=10) as executor:
             confs = [c[1] for c in self.bundles.items()]
             def create_bundle_job(demo_conf):
@@ -150,12 +204,13 @@ class JobBundler:
     def run_bundle_jobs(self, force_execution: bool = False, skip_execution = False):
         head_commit = self.get_head_commit()
         with ThreadPoolExecutor(max_workers=10) as executor:
-            def run_job(demo_conf):
+            def plan_job(demo_conf):
                 if demo_conf.job_id is not None:
                     execute = True
-                    runs = self.db.get("2.1/jobs/runs/list", {"job_id": demo_conf.job_id, 'limit': 2, 'expand_tasks': "true"})
+                    runs = self.db.get("2.1/jobs/runs/list", {"job_id": demo_conf.job_id, 'limit': 25, 'expand_tasks': "true"})
                     #Last run was successful
                     if 'runs' in runs and len(runs['runs']) > 0:
+                        self.record_job_durations(demo_conf, runs['runs'])
                         run = runs['runs'][0]
                         if run["status"]["state"] != "TERMINATED":
                             run = self.cancel_job_run(demo_conf, run)
@@ -164,43 +219,317 @@ class JobBundler:
                                 raise Exception(f"termination_details missing, should not happen. Job {demo_conf.name} status is {run['status']}")
                             elif run["status"]["termination_details"]["code"] == "SUCCESS":
                                 print(f"Job {demo_conf.name} status is {run['status']['termination_details']}...")
+                                #The last run can be partial (only the notebooks which changed): get each task from the last run it succeeded in
+                                task_runs = self.get_last_successful_task_runs(demo_conf, runs['runs'])
                                 if skip_execution:
                                     execute = False
                                     demo_conf.run_id = run['run_id']
+                                    demo_conf.previous_task_runs = task_runs
                                     print(f"skipping job execution {demo_conf.name} as it was already run and skip_execution=True.")
                                 else:
-                                    #last run was using the same commit version.
-                                    most_recent_commit = ''
-                                    for task in run['tasks']:
-                                        # Safely get the commit if git_source and git_snapshot exist
-                                        task_commit = task.get('git_source', {}).get('git_snapshot', {}).get('used_commit', '')
-                                        if task_commit > most_recent_commit:
-                                            most_recent_commit = task_commit
-                                    if not self.check_if_demo_file_changed_since_commit(demo_conf, most_recent_commit, head_commit) and most_recent_commit != '':
+                                    tasks_to_run = self.get_tasks_to_rerun(demo_conf, task_runs, head_commit)
+                                    if len(tasks_to_run) == 0:
                                         execute = False
                                         demo_conf.run_id = run['run_id']
+                                        demo_conf.previous_task_runs = task_runs
                                         print(f"skipping job execution for {demo_conf.name} as no files changed since last run. run with force_execution=true to override this check.")
-                                    
+                                    elif len(tasks_to_run) < len(self.get_bundle_tasks(demo_conf)):
+                                        print(f"{demo_conf.name}: only running the tasks impacted by the changes since the last run: {sorted(tasks_to_run)}")
+                                        demo_conf.previous_task_runs = {k: t for k, t in task_runs.items() if k not in tasks_to_run}
+                                        def start_job():
+                                            run = self.db.post("2.1/jobs/run-now", {"job_id": demo_conf.job_id, "only": sorted(tasks_to_run)})
+                                            demo_conf.run_id = run["run_id"]
+                                        return demo_conf, start_job, self.get_estimated_duration(demo_conf, tasks_to_run)
+                            elif not skip_execution:
+                                #Failed run: if the demo didn't change since, only re-run the failed tasks instead of starting from scratch.
+                                commit = self.get_run_commit(run)
+                                if commit != '' and not self.check_if_demo_file_changed_since_commit(demo_conf, commit, head_commit):
+                                    failed_tasks = self.get_failed_tasks(run)
+                                    #a run cancelled before any task started has nothing to repair: the job is started again from scratch
+                                    if len(failed_tasks) > 0:
+                                        run_task_keys = set(t['task_key'] for t in run.get('tasks', []))
+                                        demo_conf.previous_task_runs = {k: t for k, t in self.get_last_successful_task_runs(demo_conf, runs['runs']).items() if k not in run_task_keys}
+                                        return demo_conf, lambda: self.repair_job_run(demo_conf, run, failed_tasks), self.get_estimated_duration(demo_conf, failed_tasks)
+                                    print(f"Last run of {demo_conf.name} failed without any task to repair, running the job again.")
+
                     if execute:
-                        run = self.db.post("2.1/jobs/run-now", {"job_id": demo_conf.job_id})
-                        demo_conf.run_id = run["run_id"]
+                        def start_job():
+                            run = self.db.post("2.1/jobs/run-now", {"job_id": demo_conf.job_id})
+                            demo_conf.run_id = run["run_id"]
+                        return demo_conf, start_job, self.get_estimated_duration(demo_conf)
+                return None
+
+            jobs_to_start = [j for j in executor.map(plan_job, [c[1] for c in self.bundles.items()]) if j is not None]
+        self.save_job_durations()
+        self.start_bundle_jobs(jobs_to_start)
+
+    #Longest jobs first, with at most max_running_jobs jobs (clusters) running at the same time.
+    #The jobs which can't start yet are started by watch_bundle_jobs as soon as another one completes.
+    def start_bundle_jobs(self, jobs_to_start):
+        self.pending_jobs = sorted(jobs_to_start, key=lambda j: j[2], reverse=True)
+        estimation = JobBundler.get_estimated_completion([j[2] for j in self.pending_jobs], self.max_running_jobs)
+        print(f"starting {len(self.pending_jobs)} bundle jobs (max running jobs: {self.max_running_jobs}), estimated completion in {int(estimation/60000)} min")
+        #keep warm instances in the pool while the jobs are running
+        self.pool_manager.set_min_idle_instances(InstancePoolManager.get_min_idle_instances(len(self.pending_jobs), self.max_running_jobs))
+        self.start_pending_jobs()
+
+    def start_pending_jobs(self):
+        while len(self.pending_jobs) > 0 and (self.max_running_jobs is None or len(self.running_jobs) < self.max_running_jobs):
+            demo_conf, start_job, estimated_duration = self.pending_jobs.pop(0)
+            print(f"starting job for {demo_conf.name}, estimated duration {int(estimated_duration/60000)} min")
+            start_job()
+            self.running_jobs[demo_conf.run_id] = demo_conf
 
-            collections.deque(executor.map(run_job, [c[1] for c in self.bundles.items()]))
+    #Active runs among run_ids, with one paginated runs/list poll for all the bundle jobs instead of one runs/get per run.
+    #Stops paging as soon as all the run_ids are found (the most recent runs are listed first).
+    def get_active_run_ids(self, run_ids):
+        active_run_ids = set()
+        params = {"active_only": "true", "limit": 25}
+        while True:
+            runs = self.db.get("2.1/jobs/runs/list", params)
+            active_run_ids.update(r['run_id'] for r in runs.get('runs', []) if r['run_id'] in run_ids)
+            if active_run_ids == run_ids or not runs.get('has_more', False) or 'next_page_token' not in runs:
+                return active_run_ids
+            params = {**params, "page_token": runs['next_page_token']}
+
+    #Yields each bundle as soon as its job run completes (successfully or not), starting the pending jobs when slots are freed.
+    #Bundles which didn't need a run are yielded first.
+    def watch_bundle_jobs(self, poll_interval = 10):
+        watched = set(id(d) for d in self.running_jobs.values()) | set(id(j[0]) for j in self.pending_jobs)
+        for demo_conf in self.bundles.values():
+            if id(demo_conf) not in watched:
+                yield demo_conf
+        i = 0
+        #the warm instances are released even if the watch is interrupted (ctrl-c, api error...)
+        try:
+            while len(self.running_jobs) > 0 or len(self.pending_jobs) > 0:
+                active_run_ids = self.get_active_run_ids(set(self.running_jobs.keys()))
+                for run_id, demo_conf in list(self.running_jobs.items()):
+                    if run_id in active_run_ids:
+                        continue
+                    #not listed as active: one runs/get to confirm the completion and get the result
+                    run = self.db.get("2.1/jobs/runs/get", {"run_id": run_id})
+                    if run["state"]["life_cycle_state"] not in JobBundler.ACTIVE_STATES:
+                        del self.running_jobs[run_id]
+                        print(f"Job {demo_conf.get_job_name()} completed: {run['state'].get('result_state', '')} - {self.conf.workspace_url}/#job/{demo_conf.job_id}/run/{run_id}")
+                        yield demo_conf
+                self.start_pending_jobs()
+                if len(self.running_jobs) > 0:
+                    if i % 30 == 0:
+                        print(f"Waiting for {len(self.running_jobs)} running jobs ({len(self.pending_jobs)} pending): {[d.name for d in self.running_jobs.values()]}")
+                    i += 1
+                    time.sleep(poll_interval)
+        finally:
+            self.pool_manager.set_min_idle_instances(0)
+
+    #Simulates the longest-first scheduling on max_running_jobs slots, returns the total duration (ms)
+    @staticmethod
+    def get_estimated_completion(durations, max_running_jobs = None):
+        slots = [0] * max(1, len(durations) if max_running_jobs is None else max_running_jobs)
+        for duration in sorted(durations, reverse=True):
+            i = slots.index(min(slots))
+            slots[i] += duration
+        return max(slots)
+
+    def load_job_durations(self):
+        with self.job_durations_lock:
+            if self.job_durations is None:
+                self.job_durations = {}
+                if self.cache_folder is not None and os.path.exists(self.cache_folder+"/job_durations.json"):
+                    with open(self.cache_folder+"/job_durations.json", "r") as f:
+                        self.job_durations = json.loads(f.read())
+            return self.job_durations
+
+    def save_job_durations(self):
+        if self.cache_folder is not None and self.job_durations is not None:
+            os.makedirs(self.cache_folder, exist_ok=True)
+            with self.job_durations_lock:
+                with open(self.cache_folder+"/job_durations.json", "w") as f:
+                    f.write(json.dumps(self.job_durations))
+
+    #Keeps the duration (ms) of the last full successful run and of the last successful attempt of each task
+    def record_job_durations(self, demo_conf: DemoConf, runs):
+        durations = self.load_job_durations()
+        task_keys = set(task_key for task_key, _, _ in self.get_bundle_tasks(demo_conf))
+        task_durations = {}
+        duration = None
+        for run in runs:
+            if run.get('state', {}).get('result_state', '') != 'SUCCESS':
+                continue
+            if duration is None and task_keys.issubset(set(t['task_key'] for t in run.get('tasks', []))):
+                duration = run.get('run_duration', run.get('end_time', 0) - run.get('start_time', 0))
+            for task in self.sort_task_attempts(run.get('tasks', [])):
+                if task['task_key'] not in task_durations and task.get('state', {}).get('result_state', '') == 'SUCCESS' and task.get('end_time', 0) > 0:
+                    task_durations[task['task_key']] = task['end_time'] - task.get('start_time', 0)
+        with self.job_durations_lock:
+            previous = durations.get(demo_conf.name, {"duration": None, "tasks": {}})
+            durations[demo_conf.name] = {"duration": duration if duration is not None else previous["duration"],
+                                         "tasks": {**previous["tasks"], **task_durations}}
+
+    #Estimated duration (ms) of the job, or of the given tasks only. Unknown durations default to DEFAULT_JOB_DURATION.
+    def get_estimated_duration(self, demo_conf: DemoConf, task_keys = None):
+        durations = self.load_job_durations().get(demo_conf.name, {"duration": None, "tasks": {}})
+        if task_keys is None and durations["duration"] is not None:
+            return durations["duration"]
+        if task_keys is None:
+            task_keys = [task_key for task_key, _, _ in self.get_bundle_tasks(demo_conf)]
+        if any(k not in durations["tasks"] for k in task_keys):
+            return JobBundler.DEFAULT_JOB_DURATION
+        #independent tasks run in parallel: longest chain of upstream tasks
+        task_keys = set(task_keys)
+        end_times = {}
+        for task_key, _, depends_on in self.get_bundle_tasks(demo_conf):
+            start_time = max([end_times[d] for d in depends_on], default=0)
+            end_times[task_key] = start_time + (durations["tasks"][task_key] if task_key in task_keys else 0)
+        return max(end_times.values(), default=0)
 
     def wait_for_bundle_jobs_completion(self):
-        for _, demo_conf in self.bundles.items():
-            if demo_conf.run_id is not None:
-                self.wait_for_bundle_job_completion(demo_conf)
-
-    def wait_for_bundle_job_completion(self, demo_conf: DemoConf):
-        if demo_conf.run_id is not None:
-            i = 0
-            while self.db.get("2.1/jobs/runs/get", {"run_id": demo_conf.run_id})["state"]["life_cycle_state"] == "RUNNING":
-                if i % 200 == 0:
-                    print(f"Waiting for {demo_conf.get_job_name()} completion... "
-                          f"{self.conf.workspace_url}/#job/{demo_conf.job_id}/run/{demo_conf.run_id}")
-                i += 1
-                time.sleep(5)
+        collections.deque(self.watch_bundle_jobs(), maxlen=0)
+
+    #Returns the job tasks as (task_key, notebook, [upstream task_keys]), upstream tasks first.
+    #A notebook depends on the notebooks listed in its depends_on conf if any. Otherwise on the previous notebook (depends_on_previous)
+    #and on the notebooks of the job it calls with %run. Independent notebooks run in parallel.
+    def get_bundle_tasks(self, demo_conf: DemoConf):
+        with self.bundle_tasks_lock:
+            if demo_conf.name in self.bundle_tasks:
+                return self.bundle_tasks[demo_conf.name]
+        notebooks = demo_conf.get_notebooks_to_run()
+        task_keys = {os.path.normpath(demo_conf.path+"/"+n.path): f"bundle_{demo_conf.name}_{i}" for i, n in enumerate(notebooks)}
+        tasks = []
+        for i, notebook in enumerate(notebooks):
+            task_key = f"bundle_{demo_conf.name}_{i}"
+            if notebook.depends_on is not None:
+                depends_on = []
+                for path in notebook.depends_on:
+                    full_path = os.path.normpath(demo_conf.path+"/"+path)
+                    if full_path not in task_keys:
+                        raise Exception(f"Notebook {notebook.path} of {demo_conf.name} depends on {path} which isn't a pre_run notebook of the demo. Check your bundle config.")
+                    depends_on.append(task_keys[full_path])
+            else:
+                depends_on = [f"bundle_{demo_conf.name}_{i-1}"] if notebook.depends_on_previous and i > 0 else []
+                for path in self.get_notebook_run_references(demo_conf, notebook):
+                    if path in task_keys and task_keys[path] != task_key and task_keys[path] not in depends_on:
+                        depends_on.append(task_keys[path])
+            tasks.append((task_key, notebook, depends_on))
+        tasks = JobBundler.sort_tasks(tasks)
+        with self.bundle_tasks_lock:
+            self.bundle_tasks[demo_conf.name] = tasks
+        return tasks
+
+    #Paths (from the repo root) of the notebooks called with %run by this notebook
+    def get_notebook_run_references(self, demo_conf: DemoConf, notebook):
+        notebook_path = self.conf.get_repo_path()+"/"+demo_conf.path+"/"+notebook.path
+        def fetch():
+            file = self.db.get("2.0/workspace/export", {"path": notebook_path, "format": "SOURCE", "direct_download": False})
+            return base64.b64decode(file['content']) if 'content' in file else b''
+        content = self.get_cached(fetch, notebook_path, "notebook_source").decode('utf8')
+        references = []
+        folder = os.path.dirname(demo_conf.path+"/"+notebook.path)
+        for path in re.findall(r'^(?:#|--|//)?\s*(?:MAGIC)?\s*%run\s+(\S+)', content, re.MULTILINE):
+            path = path.strip('"\'')
+            if not path.startswith("/"):
+                references.append(os.path.normpath(folder+"/"+path))
+        return references
+
+    #Topological sort of the tasks, keeping the notebook order when possible
+    @staticmethod
+    def sort_tasks(tasks):
+        remaining = list(tasks)
+        sorted_tasks = []
+        done = set()
+        while len(remaining) > 0:
+            ready = next((t for t in remaining if all(d in done for d in t[2])), None)
+            if ready is None:
+                raise Exception(f"Circular dependencies between the tasks {[t[0] for t in remaining]}. Check the depends_on / %run of the notebooks.")
+            remaining.remove(ready)
+            sorted_tasks.append(ready)
+            done.add(ready[0])
+        return sorted_tasks
+
+    #Max number of tasks which can run at the same time on the job cluster (sorted tasks, one task level per longest upstream chain)
+    @staticmethod
+    def get_dag_width(tasks):
+        levels = {}
+        for task_key, notebook, depends_on in tasks:
+            levels[task_key] = max([levels[d] + 1 for d in depends_on], default=0)
+        widths = collections.Counter(levels[task_key] for task_key, notebook, _ in tasks if not notebook.warehouse_id)
+        return max(widths.values(), default=1)
+
+    #Repaired runs contain one task per attempt: latest successful attempt of each task first, then the other attempts.
+    @staticmethod
+    def sort_task_attempts(tasks):
+        return sorted(tasks, key=lambda t: (t.get('state', {}).get('result_state', '') != 'SUCCESS', -t.get('attempt_number', 0), -t.get('start_time', 0)))
+
+    @staticmethod
+    def get_run_commit(run):
+        most_recent_commit = ''
+        for task in run.get('tasks', []):
+            # Safely get the commit if git_source and git_snapshot exist
+            task_commit = task.get('git_source', run.get('git_source', {})).get('git_snapshot', {}).get('used_commit', '')
+            if task_commit > most_recent_commit:
+                most_recent_commit = task_commit
+        return most_recent_commit
+
+    @staticmethod
+    def get_failed_tasks(run):
+        #Latest attempt of each task
+        tasks = {}
+        for task in sorted(run.get('tasks', []), key=lambda t: (t.get('attempt_number', 0), t.get('start_time', 0))):
+            tasks[task['task_key']] = task
+        return sorted(k for k, t in tasks.items() if t.get('state', {}).get('result_state', '') != 'SUCCESS')
+
+    def repair_job_run(self, demo_conf: DemoConf, run, failed_tasks):
+        print(f"Last run of {demo_conf.name} failed and the demo didn't change since, repairing it with the failed tasks: {failed_tasks}")
+        repair = {"run_id": run['run_id'], "rerun_tasks": failed_tasks, "rerun_dependent_tasks": True}
+        #Subsequent repairs must reference the latest repair
+        history = self.db.get("2.1/jobs/runs/get", {"run_id": run['run_id'], "include_history": True}).get('repair_history', [])
+        repair_ids = [r['id'] for r in history if r.get('type', '') == 'REPAIR']
+        if len(repair_ids) > 0:
+            repair["latest_repair_id"] = repair_ids[-1]
+        r = self.db.post("2.1/jobs/runs/repair", repair)
+        if 'repair_id' not in r:
+            raise Exception(f"Couldn't repair run {run['run_id']} for demo {demo_conf.name}: {r}")
+        demo_conf.run_id = run['run_id']
+
+    #Latest successful task of each task key, from the most recent runs (a run can only contain the tasks which had to be re-executed)
+    def get_last_successful_task_runs(self, demo_conf: DemoConf, runs):
+        task_keys = set(task_key for task_key, _, _ in self.get_bundle_tasks(demo_conf))
+        task_runs = {}
+        for run in runs:
+            for task in self.sort_task_attempts(run.get('tasks', [])):
+                if task['task_key'] in task_keys and task['task_key'] not in task_runs and \
+                        task.get('state', {}).get('result_state', '') == 'SUCCESS':
+                    #keep the run git commit on the task to know which version of the notebook it executed
+                    if 'git_source' not in task and 'git_source' in run:
+                        task = dict(task, git_source=run['git_source'])
+                    task_runs[task['task_key']] = task
+            if len(task_runs) == len(task_keys):
+                break
+        return task_runs
+
+    #Task keys to re-execute: tasks whose notebook changed since the commit they last ran with, and their downstream tasks.
+    #Any other change in the demo folder (setup notebooks, config files...) could impact all the notebooks and re-executes all the tasks.
+    def get_tasks_to_rerun(self, demo_conf: DemoConf, task_runs, head_commit):
+        owner, repo = self.conf.repo_url.split('/')[-2:]
+        bundle_tasks = self.get_bundle_tasks(demo_conf)
+        notebook_paths = {os.path.normpath(demo_conf.path+"/"+notebook.path): task_key for task_key, notebook, _ in bundle_tasks}
+        tasks_to_run = set()
+        for task_key, notebook, _ in bundle_tasks:
+            commit = task_runs.get(task_key, {}).get('git_source', {}).get('git_snapshot', {}).get('used_commit', '')
+            if commit == '':
+                tasks_to_run.add(task_key)
+                continue
+            changed_files = self.get_changed_files_trie(owner, repo, commit, head_commit)
+            if changed_files.contains(os.path.normpath(demo_conf.path+"/"+notebook.path)):
+                tasks_to_run.add(task_key)
+            for f in changed_files.list(demo_conf.path):
+                if os.path.splitext(f)[0] not in notebook_paths and f not in notebook_paths:
+                    return set(t for t, _, _ in bundle_tasks)
+        #add the downstream tasks
+        for task_key, _, depends_on in bundle_tasks:
+            if any(d in tasks_to_run for d in depends_on):
+                tasks_to_run.add(task_key)
+        return tasks_to_run
 
     def create_bundle_job(self, demo_conf: DemoConf, recreate_jobs: bool = False):
         notebooks_to_run = demo_conf.get_notebooks_to_run()
@@ -214,6 +543,8 @@ class JobBundler:
             default_job_conf["git_source"]["git_branch"] = self.conf.branch
 
             cluster_conf = self.get_cluster_conf(demo_conf)
+            bundle_tasks = self.get_bundle_tasks(demo_conf)
+            dag_width = JobBundler.get_dag_width(bundle_tasks)
             #Update the job cluster with the specific demo setup if any
             for job_cluster in default_job_conf["job_clusters"]:
                 merge_dict(job_cluster["new_cluster"], cluster_conf)
@@ -229,25 +560,31 @@ class JobBundler:
                     job_cluster["new_cluster"].pop("node_type_id", None)
                     job_cluster["new_cluster"].pop("enable_elastic_disk", None)
                     job_cluster["new_cluster"].pop("aws_attributes", None)
-                elif 'instance_pool_id' in job_cluster["new_cluster"]:
-                    job_cluster["new_cluster"].pop('node_type_id', None)
-                    job_cluster["new_cluster"].pop("enable_elastic_disk", None)
-                    job_cluster["new_cluster"].pop("aws_attributes", None)
+                elif "node_type_id" not in job_cluster["new_cluster"]:
+                    job_cluster["new_cluster"]["node_type_id"] = self.pool_manager.get_node_type()
 
                 job_cluster["new_cluster"].pop('cluster_name', None)
                 job_cluster["new_cluster"].pop('autotermination_minutes', None)
                 if job_cluster["new_cluster"]["spark_conf"].get("spark.databricks.cluster.profile", "") == "singleNode":
                     del job_cluster["new_cluster"]["autoscale"]
                     job_cluster["new_cluster"]["num_workers"] = 0
+                #The parallel tasks share the job cluster: size it for the widest level of the task graph
+                elif dag_width > 1:
+                    if "autoscale" in job_cluster["new_cluster"]:
+                        autoscale = job_cluster["new_cluster"]["autoscale"]
+                        autoscale["max_workers"] = max(autoscale["max_workers"], min(autoscale["max_workers"] * dag_width, JobBundler.MAX_JOB_CLUSTER_WORKERS))
+                    elif job_cluster["new_cluster"].get("num_workers", 0) > 0:
+                        num_workers = job_cluster["new_cluster"]["num_workers"]
+                        job_cluster["new_cluster"]["num_workers"] = max(num_workers, min(num_workers * dag_width, JobBundler.MAX_JOB_CLUSTER_WORKERS))
             default_job_conf['tasks'] = []
 
             # Added for unit testing 01/13/2025. Enforcing single user to reduce
             #  complexity of testing.
             default_job_conf["run_as"] = {"user_name": self.conf.run_test_as_username}
 
-            for i, notebook in enumerate(notebooks_to_run):
+            for task_key, notebook, depends_on in bundle_tasks:
                 task = {
-                    "task_key": f"bundle_{demo_conf.name}_{i}",
+                    "task_key": task_key,
                     "notebook_task": {
                         "notebook_path": demo_conf.path+"/"+notebook.path,
                         "base_parameters": {"reset_all_data": "false"},
@@ -261,11 +598,9 @@ class JobBundler:
                 if notebook.warehouse_id:
                     del task["job_cluster_key"]
                     task["notebook_task"]["warehouse_id"] = notebook.warehouse_id
-                if notebook.depends_on_previous:
-                    task["depends_on"] = [{"task_key": f"bundle_{demo_conf.name}_{i-1}"}]
+                if len(depends_on) > 0:
+                    task["depends_on"] = [{"task_key": d} for d in depends_on]
                 default_job_conf['tasks'].append(task)
-            if "depends_on" in default_job_conf['tasks'][0]:
-                del default_job_conf['tasks'][0]["depends_on"]
 
             return self.create_or_update_job(demo_conf, default_job_conf, recreate_jobs)
 
@@ -292,26 +627,93 @@ class JobBundler:
         if base_commit is None or base_commit == '':
             return True
         owner, repo = self.conf.repo_url.split('/')[-2:]
-        files = self.get_changed_files_since_commit(owner, repo, base_commit, last_commit)
-        return any(f.startswith(demo_conf.path) for f in files)
+        return self.get_changed_files_trie(owner, repo, base_commit, last_commit).contains(demo_conf.path)
 
     def get_changed_files_since_commit(self, owner, repo, base_commit, last_commit = None):
+        return self.get_changed_files_trie(owner, repo, base_commit, last_commit).paths
+
+    #Changed files are computed once per (base, last) commits, concurrent callers wait for the first one.
+    def get_changed_files_trie(self, owner, repo, base_commit, last_commit = None) -> PathTrie:
+        if last_commit is None:
+            last_commit = self.get_head_commit()
+        key = (owner, repo, base_commit, last_commit)
+        with self.changed_files_lock:
+            if key not in self.changed_files:
+                self.changed_files[key] = {"lock": threading.Lock(), "trie": None}
+            entry = self.changed_files[key]
+        with entry["lock"]:
+            if entry["trie"] is None:
+                files = None
+                if self.local_repo_path is not None:
+                    files = self.get_changed_files_from_local_repo(base_commit, last_commit)
+                if files is None:
+                    files = self.get_changed_files_from_github(owner, repo, base_commit, last_commit)
+                if files is None:
+                    print(f"WARN: changed files of {base_commit}...{last_commit} unknown, all the demos are considered as changed")
+                    entry["trie"] = PathTrie(complete=False)
+                else:
+                    entry["trie"] = PathTrie(files)
+            return entry["trie"]
+
+    def get_changed_files_from_local_repo(self, base_commit, last_commit):
+        r = subprocess.run(["git", "-C", self.local_repo_path, "diff", "--name-only", "--no-renames", f"{base_commit}...{last_commit}"], capture_output=True, text=True)
+        if r.returncode != 0:
+            print(f"WARN: couldn't diff {base_commit}...{last_commit} in {self.local_repo_path}, using github api instead. {r.stderr}")
+            return None
+        return [f for f in r.stdout.split("\n") if len(f) > 0]
+
+    def get_github(self, url, params = None):
         headers = {
             "Accept": "application/vnd.github.v3+json",
             "Authorization": f"token {self.conf.github_token}"
         }
-        if last_commit is None:
-            last_commit = self.get_head_commit()
+        response = requests.get(url, headers=headers, params=params)
+        if response.status_code != 200:
+            raise Exception(f"Error fetching {url}: {response.status_code}, {response.text}")
+        return response.json()
+
+    @staticmethod
+    def get_file_names(files):
+        names = []
+        for file in files:
+            names.append(file['filename'])
+            #a file moved out of a demo is a change for the demo
+            if 'previous_filename' in file:
+                names.append(file['previous_filename'])
+        return names
+
+    #The compare api returns 300 files max: above, the files are listed from each commit of the comparison instead.
+    #Returns None if a commit has more files than github can list.
+    def get_changed_files_from_github(self, owner, repo, base_commit, last_commit):
         # Compare the base commit with the latest commit
         compare_url = f"https://api.github.com/repos/{owner}/{repo}/compare/{base_commit}...{last_commit}"
-        compare_response = requests.get(compare_url, headers=headers)
-
-        if compare_response.status_code == 200:
-            data = compare_response.json()
-            files = data['files']
-            return [file['filename'] for file in files]
-        else:
-            raise Exception(f"Error fetching latest commit: {compare_response.status_code}, {compare_response.text}")
+        compare = self.get_github(compare_url)
+        if len(compare.get('files', [])) < JobBundler.GITHUB_COMPARE_MAX_FILES:
+            return JobBundler.get_file_names(compare.get('files', []))
+        print(f"WARN: github file list of {base_commit}...{last_commit} is truncated ({len(compare.get('files', []))} files), listing the files of its {compare.get('total_commits')} commits")
+        #the commits of the comparison are paginated
+        commits = []
+        page = 1
+        while len(commits) < compare.get('total_commits', 0):
+            page_commits = self.get_github(compare_url, {"per_page": 100, "page": page}).get('commits', [])
+            if len(page_commits) == 0:
+                break
+            commits.extend(c['sha'] for c in page_commits)
+            page += 1
+        files = set()
+        for sha in commits:
+            #the files of a commit are paginated, up to 3000 files
+            page = 1
+            while True:
+                commit_files = self.get_github(f"https://api.github.com/repos/{owner}/{repo}/commits/{sha}", {"per_page": JobBundler.GITHUB_COMPARE_MAX_FILES, "page": page}).get('files', [])
+                files.update(JobBundler.get_file_names(commit_files))
+                if len(commit_files) < JobBundler.GITHUB_COMPARE_MAX_FILES:
+                    break
+                if page * JobBundler.GITHUB_COMPARE_MAX_FILES >= JobBundler.GITHUB_COMMIT_MAX_FILES:
+                    print(f"WARN: commit {sha} has more than {JobBundler.GITHUB_COMMIT_MAX_FILES} files")
+                    return None
+                page += 1
+        return sorted(files)
 
     def cancel_job_run(self, demo_conf: DemoConf, run):
         """Cancel a running job and wait for termination"""
@@ -0,0 +1,159 @@
+import codecs
+import re
+
+
+class JsonStringExtractor:
+    """
+    Streams a single string value out of a large json document without loading the document in memory.
+    The value is located by its path, ex: ["views", 0, "content"] for the html of the first view of a job run export,
+    and written (unescaped) to the output as the chunks are received.
+    Only the target value is decoded, other strings are skipped.
+    """
+    STRING_SPECIAL_CHARS = re.compile(r'["\\]')
+    ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self, path: list, output):
+        self.path = path
+        self.output = output
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        #one entry per open container: [is_object, current key or index, expecting a key]
+        self.stack = []
+        self.carry = ""
+        self.in_string = False
+        self.string_is_key = False
+        self.string_is_target = False
+        self.key_buffer = []
+        self.found = False
+        self.done = False
+
+    def get_current_path(self):
+        return [e[1] for e in self.stack]
+
+    def feed(self, chunk: bytes):
+        if not self.done:
+            self.process(self.carry + self.decoder.decode(chunk))
+        return self.done
+
+    def close(self):
+        if not self.done:
+            self.process(self.carry + self.decoder.decode(b"", final=True))
+        return self.found
+
+    def write_string(self, text):
+        if self.string_is_target:
+            self.output.write(text)
+        elif self.string_is_key:
+            self.key_buffer.append(text)
+
+    def end_string(self):
+        self.in_string = False
+        if self.string_is_target:
+            self.found = True
+            self.done = True
+        elif self.string_is_key:
+            self.stack[-1][1] = "".join(self.key_buffer)
+            self.stack[-1][2] = False
+            self.key_buffer = []
+
+    def start_value(self):
+        #Called before a value starts: a value in an array increments the index
+        if len(self.stack) > 0 and not self.stack[-1][0]:
+            self.stack[-1][1] += 1
+
+    def process(self, text):
+        self.carry = ""
+        i, n = 0, len(text)
+        while i < n and not self.done:
+            if self.in_string:
+                if not self.string_is_target and not self.string_is_key:
+                    #fast skip of the strings we don't need
+                    j = i
+                    while True:
+                        j = text.find('"', j)
+                        if j < 0:
+                            break
+                        backslashes = 0
+                        while j-1-backslashes >= i and text[j-1-backslashes] == '\\':
+                            backslashes += 1
+                        if backslashes % 2 == 0:
+                            break
+                        j += 1
+                    if j < 0:
+                        #keep the trailing backslashes, they could escape a quote in the next chunk
+                        k = n
+                        while k > i and text[k-1] == '\\':
+                            k -= 1
+                        self.carry = text[k:] if (n-k) % 2 == 1 else ""
+                        return
+                    i = j+1
+                    self.end_string()
+                    continue
+                m = JsonStringExtractor.STRING_SPECIAL_CHARS.search(text, i)
+                j = m.start() if m is not None else n
+                if j > i:
+                    self.write_string(text[i:j])
+                if j >= n:
+                    return
+                if text[j] == '"':
+                    i = j+1
+                    self.end_string()
+                    continue
+                #escape sequence
+                if j+1 >= n:
+                    self.carry = text[j:]
+                    return
+                c = text[j+1]
+                if c == 'u':
+                    if j+6 > n:
+                        self.carry = text[j:]
+                        return
+                    code = int(text[j+2:j+6], 16)
+                    if 0xD800 <= code < 0xDC00:
+                        #surrogate pair
+                        if j+12 > n:
+                            self.carry = text[j:]
+                            return
+                        if text[j+6:j+8] == '\\u':
+                            low = int(text[j+8:j+12], 16)
+                            self.write_string(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                            i = j+12
+                            continue
+                    self.write_string(chr(code))
+                    i = j+6
+                else:
+                    self.write_string(JsonStringExtractor.ESCAPES.get(c, c))
+                    i = j+2
+                continue
+            c = text[i]
+            if c == '"':
+                self.in_string = True
+                self.string_is_key = len(self.stack) > 0 and self.stack[-1][0] and self.stack[-1][2]
+                if not self.string_is_key:
+                    self.start_value()
+                self.string_is_target = not self.string_is_key and self.get_current_path() == self.path
+                i += 1
+            elif c == '{' or c == '[':
+                self.start_value()
+                self.stack.append([c == '{', None if c == '{' else -1, c == '{'])
+                i += 1
+            elif c == '}' or c == ']':
+                self.stack.pop()
+                if len(self.stack) == 0:
+                    self.done = True
+                i += 1
+            elif c == ',':
+                if self.stack[-1][0]:
+                    self.stack[-1][2] = True
+                i += 1
+            elif c in ' \t\r\n:':
+                i += 1
+            else:
+                #number, true, false, null: skip the literal
+                j = i
+                while j < n and text[j] not in ',}] \t\r\n':
+                    j += 1
+                if j >= n:
+                    self.carry = text[i:]
+                    return
+                self.start_value()
+                i = j
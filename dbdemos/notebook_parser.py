@@ -215,6 +215,19 @@ class NotebookParser:
                 c["hideCommandResult"] = True
         self.content = json.dumps(content)
 
+    #Lite notebooks: cap the cell results to reduce the notebook size, users will re-run the cells anyway.
+    # max_rows keeps the first rows of table results, results bigger than max_result_size (json chars) are dropped.
+    def cap_results(self, max_rows = None, max_result_size = None):
+        content = json.loads(self.content)
+        for c in content["commands"]:
+            if "results" not in c or c["results"] is None:
+                continue
+            if max_rows is not None and c["results"].get("type") == "table" and isinstance(c["results"].get("data"), list):
+                c["results"]["data"] = c["results"]["data"][:max_rows]
+            if max_result_size is not None and len(json.dumps(c["results"])) > max_result_size:
+                c["results"] = None
+        self.content = json.dumps(content)
+
     def remove_delete_cell(self):
         content = json.loads(self.content)
         content["commands"] = [c for c in content["commands"] if "#dbdemos__delete_this_cell" not in c["command"].lower()]
@@ -2,154 +2,483 @@ import pkg_resources
 from pathlib import Path
 from .conf import DBClient, DemoConf, Conf, DemoNotebook
 from .notebook_parser import NotebookParser
+from .html_shell import HtmlShell
+from .export_cache import ExportCache
+from .workspace_archive import WorkspaceArchive
+from .bundle_pack import BundlePack
+from .json_stream import JsonStringExtractor
 import json
 import os
 import re
 import shutil
 import base64
 from .job_bundler import JobBundler
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import collections
 import zipfile
 import io
+import threading
+import multiprocessing
+import tempfile
+import gzip
+import hashlib
+
+
+#Notebook transformations are CPU bound (regex, json round-trips, base64) and run in a process pool to escape the GIL.
+#They're module level functions so that they can be sent to the worker processes.
+def transform_notebook(html, max_result_rows = None, max_result_size = None):
+    parser = NotebookParser(html)
+    parser.remove_uncomment_tag()
+    parser.set_environement_metadata()
+    parser.remove_dbdemos_build()
+    #parser.remove_static_settings()
+    parser.hide_commands_and_results()
+    if max_result_rows is not None or max_result_size is not None:
+        parser.cap_results(max_result_rows, max_result_size)
+    #Moving away from the initial 00-global-setup, remove it once migration is completed
+    requires_global_setup_v2 = False
+    if parser.contains("00-global-setup-v2"):
+        parser.replace_in_notebook('(?:\.\.\/)*_resources\/00-global-setup-v2', './00-global-setup-v2', True)
+        requires_global_setup_v2 = True
+    elif parser.contains("00-global-setup"):
+        raise Exception("00-global-setup is deprecated. Please use 00-global-setup-v2 instead.")
+    return HtmlShell.split(parser.get_html()), requires_global_setup_v2
+
+
+def render_minisite_page(html):
+    parser = NotebookParser(html)
+    parser.remove_robots_meta()
+    parser.add_cell_as_html_for_seo()
+    parser.remove_delete_cell()
+    parser.add_javascript_to_minisite_relative_links()
+    return parser.get_html()
+
+
+def read_notebook_html(full_path):
+    return HtmlShell.read(full_path, f"dbdemos/{HtmlShell.SHELL_FOLDER}")
+
+
+#Writes the file with .gz (and .br if brotli is installed) precompressed versions for the static hosting.
+#Each version is written to a tmp file and renamed: the pages rendered in parallel share the same static assets.
+def write_minisite_file(path, content: str):
+    content = content.encode('utf-8')
+    write_file_atomic(path, content)
+    write_file_atomic(path+".gz", gzip.compress(content, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    write_file_atomic(path+".br", brotli.compress(content))
+
+
+def write_file_atomic(path, content: bytes):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+#Renders the minisite page from the bundled notebook. The static settings go to a shared asset, written once for all the pages.
+def build_minisite_page(notebook_path, full_path, assets_folder, assets_src):
+    html, asset_name, asset_content = HtmlShell.extract_static_settings(read_notebook_html(notebook_path), assets_src)
+    html = render_minisite_page(html)
+    if asset_name is not None and not Path(assets_folder+"/"+asset_name).exists():
+        write_minisite_file(assets_folder+"/"+asset_name, asset_content)
+    write_minisite_file(full_path, html)
 
 
 class Packager:
     DASHBOARD_IMPORT_API = "_import_api"
-    def __init__(self, conf: Conf, jobBundler: JobBundler):
+    #Increase when the minisite rendering changes to rebuild all the pages
+    MINISITE_VERSION = 1
+    MINISITE_ASSETS_FOLDER = "assets"
+    BUNDLES_FOLDER = "bundles"
+    LITE_BUNDLES_FOLDER = "bundles_lite"
+    #max_result_rows / max_result_size package lite notebooks with capped cell results (see NotebookParser.cap_results).
+    #Lite bundles are saved in their own folder (dbdemos/bundles_lite) next to the normal bundles, without minisite.
+    #cache_folder keeps the workspace exports & packaging state between runs to package unchanged demos incrementally (None to disable)
+    #bundle_compression ("zlib" or "zstd") packs each bundle in a single file instead of loose files (see BundlePack). zstd requires the zstandard package to install the demo.
+    #export_workers is the max number of concurrent workspace export calls, shared by all the demos
+    def __init__(self, conf: Conf, jobBundler: JobBundler, max_result_rows: int = None, max_result_size: int = None, cache_folder: str = ".dbdemos_cache",
+                 bundle_compression: str = None, export_workers: int = 10):
         self.db = DBClient(conf)
         self.jobBundler = jobBundler
+        self.max_result_rows = max_result_rows
+        self.max_result_size = max_result_size
+        self.lite = max_result_rows is not None or max_result_size is not None
+        self.bundles_folder = Packager.LITE_BUNDLES_FOLDER if self.lite else Packager.BUNDLES_FOLDER
+        self.cache_folder = cache_folder
+        assert bundle_compression in [None, "zlib", "zstd"], "bundle_compression should be None, zlib or zstd"
+        self.bundle_compression = bundle_compression
+        self.export_cache = ExportCache(cache_folder+"/exports") if cache_folder is not None else None
+        self.index_template = None
+        self.shell_lock = threading.Lock()
+        #All the workspace exports go through a single queue to keep a steady load on the API, whatever the number of demos packaged in parallel.
+        self.export_workers = export_workers
+        self.export_executor = None
+        self.export_executor_lock = threading.Lock()
+        #Network calls run on threads, notebook transformations & minisite rendering on a shared process pool.
+        self.process_pool = None
+        self.process_pool_lock = threading.Lock()
+        self.process_pool_workers = os.cpu_count() or 1
+        #Bounded queue between the download threads and the process pool to keep the memory under control
+        self.process_pool_slots = threading.BoundedSemaphore(self.process_pool_workers * 2)
+
+    def get_export_executor(self):
+        with self.export_executor_lock:
+            if self.export_executor is None:
+                self.export_executor = ThreadPoolExecutor(max_workers=self.export_workers)
+            return self.export_executor
 
-    def package_all(self, iframe_root_src = "./"):
+    def close_export_executor(self):
+        with self.export_executor_lock:
+            if self.export_executor is not None:
+                self.export_executor.shutdown()
+                self.export_executor = None
+
+    #Started by package_all before any export thread: forking a process with running threads can deadlock the child
+    #on a lock held by another thread (logging, ssl...), the workers are spawned instead.
+    def get_process_pool(self):
+        with self.process_pool_lock:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(max_workers=self.process_pool_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self.process_pool
+
+    def close_process_pool(self):
+        with self.process_pool_lock:
+            if self.process_pool is not None:
+                self.process_pool.shutdown()
+                self.process_pool = None
+
+    #Blocks when the process pool already has enough pending work
+    def submit_to_process_pool(self, fn, *args):
+        self.process_pool_slots.acquire()
+        try:
+            future = self.get_process_pool().submit(fn, *args)
+        except Exception:
+            self.process_pool_slots.release()
+            raise
+        future.add_done_callback(lambda f: self.process_pool_slots.release())
+        return future
+
+    #demo_confs: optional iterable of the demos to package, ex: JobBundler.watch_bundle_jobs() to package each demo as soon as its job completes.
+    def package_all(self, iframe_root_src = "./", force_package = False, demo_confs = None):
         def package_demo(demo_conf: DemoConf):
+            #must be computed before packaging as the packaging updates the demo conf
+            fingerprint = self.get_demo_fingerprint(demo_conf, iframe_root_src)
+            if not force_package and self.is_demo_unchanged(demo_conf, fingerprint):
+                print(f"skipping packaging for {demo_conf.name} as nothing changed since the last packaging. Run with force_package=True to override this check.")
+                return
             self.clean_bundle(demo_conf)
             self.package_demo(demo_conf)
             if len(demo_conf.dashboards) > 0:
                 self.extract_lakeview_dashboards(demo_conf)
-            self.build_minisite(demo_conf, iframe_root_src)
+            if not self.lite:
+                self.build_minisite(demo_conf, iframe_root_src)
+            self.save_bundle_conf(demo_conf)
+            if self.bundle_compression is not None:
+                self.pack_bundle(demo_conf)
+            self.save_packaging_state(demo_conf, fingerprint)
             
-        confs = [demo_conf for _, demo_conf in self.jobBundler.bundles.items()]        
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            collections.deque(executor.map(package_demo, confs))
+        #Largest demos first: their exports are queued first so they don't end up alone at the end of the packaging.
+        confs = demo_confs
+        if confs is None:
+            confs = sorted([demo_conf for _, demo_conf in self.jobBundler.bundles.items()], key=lambda c: len(c.notebooks), reverse=True)
+        self.get_process_pool()
+        try:
+            #Demo threads mostly wait for their exports (the per-demo barrier before the minisite build),
+            #the load on the workspace is bounded by the export queue (export_workers), not by the number of demos.
+            with ThreadPoolExecutor(max_workers=max(3, self.export_workers)) as executor:
+                collections.deque(executor.map(package_demo, confs))
+            self.remove_unused_shells()
+        finally:
+            self.close_export_executor()
+            self.close_process_pool()
+            if self.export_cache is not None:
+                self.export_cache.evict()
+
+    #Shells are shared by the notebooks: a shell is kept as long as a model file of a bundle (loose or packed, normal or lite) or a template uses it
+    def remove_unused_shells(self, root: str = "dbdemos"):
+        def get_shell_id(head: bytes):
+            match = re.search(r'"shell": "([0-9a-f]+)"', head.decode('utf-8', errors='ignore'))
+            return match.group(1) if match is not None else None
+        used_shells = set()
+        bundles_folders = [Path(root+"/"+folder) for folder in [Packager.BUNDLES_FOLDER, Packager.LITE_BUNDLES_FOLDER]]
+        model_paths = [p for folder in bundles_folders for p in folder.rglob("*"+HtmlShell.MODEL_EXTENSION)]
+        for model_path in model_paths + list(Path(root+"/template").glob("*"+HtmlShell.MODEL_EXTENSION)):
+            with open(model_path, "rb") as f:
+                used_shells.add(get_shell_id(f.read(100)))
+        for pack_path in [p for folder in bundles_folders for p in folder.rglob(BundlePack.FILE_NAME)]:
+            pack = BundlePack(str(pack_path))
+            for name in pack.entries:
+                if name.endswith(HtmlShell.MODEL_EXTENSION):
+                    with pack.open(name) as f:
+                        used_shells.add(get_shell_id(f.read(100)))
+            pack.close()
+        for shell_path in Path(root+"/"+HtmlShell.SHELL_FOLDER).glob("*.html"):
+            if shell_path.stem not in used_shells:
+                print(f"removing unused notebook shell {shell_path}")
+                shell_path.unlink()
+
+    def get_demo_fingerprint(self, demo_conf: DemoConf, iframe_root_src):
+        return ExportCache.get_key(json.dumps(demo_conf.json_conf, sort_keys=True), demo_conf.run_id, iframe_root_src, self.max_result_rows, self.max_result_size, self.bundle_compression)
+
+    def get_packaging_state_path(self, demo_conf: DemoConf):
+        if self.lite:
+            return f"{self.cache_folder}/packaging_state/{self.bundles_folder}/{demo_conf.name}.json"
+        return f"{self.cache_folder}/packaging_state/{demo_conf.name}.json"
+
+    def save_packaging_state(self, demo_conf: DemoConf, fingerprint):
+        if self.cache_folder is not None and self.jobBundler.head_commit_id is not None:
+            state_path = self.get_packaging_state_path(demo_conf)
+            Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(state_path, "w") as f:
+                f.write(json.dumps({"fingerprint": fingerprint, "head_commit_id": self.jobBundler.head_commit_id}))
+
+    #A demo is unchanged if it has the same conf & job run, and none of its files changed in the repo since its last packaging.
+    def is_demo_unchanged(self, demo_conf: DemoConf, fingerprint):
+        head_commit_id = self.jobBundler.head_commit_id
+        if self.cache_folder is None or head_commit_id is None or not Path(self.get_packaging_state_path(demo_conf)).exists() or \
+                not Path(demo_conf.get_bundle_root_path(self.bundles_folder)+"/conf.json").exists():
+            return False
+        with open(self.get_packaging_state_path(demo_conf), "r") as f:
+            state = json.loads(f.read())
+        if state["fingerprint"] != fingerprint:
+            return False
+        if state["head_commit_id"] == head_commit_id:
+            return True
+        try:
+            owner, repo = self.jobBundler.conf.repo_url.split('/')[-2:]
+            changed_files = self.jobBundler.get_changed_files_trie(owner, repo, state["head_commit_id"], head_commit_id)
+        except Exception as e:
+            print(f"WARN: couldn't get the files changed since the last packaging of {demo_conf.name}, will package it again. {e}")
+            return False
+        #notebooks can be outside of the demo folder (../), and the global setup is shared by all the demos
+        prefixes = [demo_conf.path+"/", "_resources/00-global-setup-v2"] + [os.path.normpath(demo_conf.path+"/"+n.path) for n in demo_conf.notebooks]
+        return not any(changed_files.contains(prefix) for prefix in prefixes)
+
+    #Repo objects are immutable for a given staging repo head commit, and job results for a given task run id.
+    def get_cached(self, fetch, *key):
+        if self.export_cache is None or None in key:
+            return fetch()
+        return self.export_cache.get_or_fetch(ExportCache.get_key(*key), fetch)
+
+    def export_repo_object(self, repo_path, format, direct_download, error_message):
+        def fetch():
+            file = self.db.get("2.0/workspace/export", {"path": repo_path, "format": format, "direct_download": direct_download})
+            if 'error_code' in file:
+                raise Exception(f"{error_message} {file['error_code']} - {file['message']}")
+            return base64.b64decode(file['content'])
+        return self.get_cached(fetch, repo_path, self.jobBundler.head_commit_id, format)
+
+    def get_repo_object_status(self, repo_path):
+        def fetch():
+            status = self.db.get("2.0/workspace/get-status", {"path": repo_path})
+            if 'error_code' in status:
+                raise Exception(f"Couldn't find file {repo_path} in workspace. Check notebook path in bundle conf file. {status['error_code']} - {status['message']}")
+            return json.dumps(status).encode('utf-8')
+        return json.loads(self.get_cached(fetch, repo_path, self.jobBundler.head_commit_id, "get-status"))
+
+    #Run exports can be tens of MB (ML outputs): the html of the first view is streamed to a file instead of parsing the whole json response.
+    def export_run_notebook_html(self, task_run_id, notebook: DemoNotebook, demo_conf: DemoConf):
+        def download(destination_path):
+            with open(destination_path, "w", encoding="utf-8") as f:
+                extractor = JsonStringExtractor(["views", 0, "content"], f)
+                for chunk in self.db.stream("2.1/jobs/runs/export", {'run_id': task_run_id, 'views_to_export': 'ALL'}):
+                    if extractor.feed(chunk):
+                        break
+                if not extractor.close():
+                    raise Exception(f"couldn't get notebook for run {task_run_id} - {notebook.path}. {demo_conf.name}. You probably did a run repair. Please re run the job.")
+        if self.export_cache is None:
+            with tempfile.TemporaryDirectory() as tmp_folder:
+                download(tmp_folder+"/notebook.html")
+                with open(tmp_folder+"/notebook.html", "r", encoding="utf-8") as f:
+                    return f.read()
+        path = self.export_cache.get_or_download(ExportCache.get_key("runs/export", task_run_id), download)
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    #Index the run tasks by notebook path suffix (a/b/c => c, b/c, a/b/c) to find the task of each notebook. The first task wins.
+    @staticmethod
+    def get_tasks_by_notebook_path(run_tasks, tasks = None):
+        tasks = {} if tasks is None else tasks
+        for task in run_tasks:
+            parts = task['notebook_task']['notebook_path'].strip("/").split("/")
+            for i in range(len(parts)):
+                tasks.setdefault("/".join(parts[i:]), task)
+        return tasks
+
+    def export_repo_folder(self, repo_path, tmp_folder):
+        def download(destination_path):
+            self.db.download("2.0/workspace/export", {"path": repo_path, "format": "AUTO", "direct_download": True}, destination_path)
+        if self.export_cache is None or self.jobBundler.head_commit_id is None:
+            zip_path = tmp_folder+"/folder.zip"
+            download(zip_path)
+            return zip_path
+        return self.export_cache.get_or_download(ExportCache.get_key(repo_path, self.jobBundler.head_commit_id, "AUTO", "folder"), download)
+
+    #Export the demo folder once as an archive to get the object types & files without calling the API for each notebook.
+    #Returns None (objects are then exported one by one) if the demo doesn't have repo objects or the folder can't be exported.
+    def get_demo_archive(self, demo_conf: DemoConf, tmp_folder):
+        if not any(not n.pre_run and not n.path.startswith("..") for n in demo_conf.notebooks):
+            return None
+        repo_path = os.path.realpath(self.jobBundler.conf.get_repo_path()+"/"+demo_conf.path)
+        try:
+            return WorkspaceArchive(self.export_repo_folder(repo_path, tmp_folder), repo_path)
+        except Exception as e:
+            print(f"WARN: couldn't export {repo_path} as an archive, will export the demo objects one by one. {e}")
+            return None
 
     def clean_bundle(self, demo_conf: DemoConf):
-        if Path(demo_conf.get_bundle_root_path()).exists():
-            shutil.rmtree(demo_conf.get_bundle_root_path())
+        if Path(demo_conf.get_bundle_root_path(self.bundles_folder)).exists():
+            shutil.rmtree(demo_conf.get_bundle_root_path(self.bundles_folder))
+
 
+    #Replaces the bundle files by a single pack file. conf.json stays as it is to list the demos without opening the packs.
+    def pack_bundle(self, demo_conf: DemoConf):
+        root = demo_conf.get_bundle_root_path(self.bundles_folder)
+        files = BundlePack.create(root, root+"/"+BundlePack.FILE_NAME, exclude=["conf.json"], compression=self.bundle_compression)
+        for file in files:
+            os.remove(root+"/"+file)
+        for folder, _, _ in sorted(os.walk(root), reverse=True):
+            if folder != root and len(os.listdir(folder)) == 0:
+                os.rmdir(folder)
+        print(f"{demo_conf.name} bundle packed in {root}/{BundlePack.FILE_NAME} ({len(files)} files)")
 
     def extract_lakeview_dashboards(self, demo_conf: DemoConf):
-        for d in demo_conf.dashboards:
-            repo_path = self.jobBundler.conf.get_repo_path()+"/"+demo_conf.path+"/_resources/dashboards/"+d['id']+".lvdash.json"
-            repo_path = os.path.realpath(repo_path)
-            dashboard_file = self.db.get("2.0/workspace/export", {"path": repo_path, "format": "SOURCE", "direct_download": False})
-            if 'error_code' in dashboard_file:
-                raise Exception(f"Couldn't find dashboard {repo_path} in repo. Check repo ID in bundle conf file and make sure the dashboard is here. "
-                                f"{dashboard_file['error_code']} - {dashboard_file['message']}")
-            dashboard_file = base64.b64decode(dashboard_file['content']).decode('utf-8')
-            full_path = demo_conf.get_bundle_path()+"/_resources/dashboards/"+d['id']+".lvdash.json"
-            Path(full_path[:full_path.rindex("/")]).mkdir(parents=True, exist_ok=True)
-            with open(full_path, "w") as f:
-                f.write(dashboard_file)
+        futures = [self.get_export_executor().submit(self.extract_lakeview_dashboard, demo_conf, d) for d in demo_conf.dashboards]
+        for future in futures:
+            future.result()
+
+    def extract_lakeview_dashboard(self, demo_conf: DemoConf, d):
+        repo_path = self.jobBundler.conf.get_repo_path()+"/"+demo_conf.path+"/_resources/dashboards/"+d['id']+".lvdash.json"
+        repo_path = os.path.realpath(repo_path)
+        dashboard_file = self.export_repo_object(repo_path, "SOURCE", False, f"Couldn't find dashboard {repo_path} in repo. Check repo ID in bundle conf file and make sure the dashboard is here.")
+        dashboard_file = dashboard_file.decode('utf-8')
+        full_path = demo_conf.get_bundle_path(self.bundles_folder)+"/_resources/dashboards/"+d['id']+".lvdash.json"
+        Path(full_path[:full_path.rindex("/")]).mkdir(parents=True, exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(dashboard_file)
 
 
-    def process_file_content(self, file, destination_path, extension = ""):
-        # Decode base64 content from the folder dict
-        file_content = base64.b64decode(file['content'])
+    def process_file_content(self, file_content: bytes, destination_path, extension = ""):
         with open(destination_path + extension, "wb") as f:
             f.write(file_content)
 
+    #Only the notebook model is saved in the bundle, the viewer shell is stored once per version under dbdemos/shells (see HtmlShell)
+    def save_notebook_html(self, html, full_path):
+        self.write_notebook(HtmlShell.split(html), full_path)
+
+    def write_notebook(self, split_html, full_path):
+        shell_id, shell, model = split_html
+        shell_path = f"dbdemos/{HtmlShell.SHELL_FOLDER}/{shell_id}.html"
+        with self.shell_lock:
+            if not Path(shell_path).exists():
+                Path(shell_path).parent.mkdir(parents=True, exist_ok=True)
+                with open(shell_path, "w") as f:
+                    f.write(shell)
+        with open(full_path+HtmlShell.MODEL_EXTENSION, "w") as f:
+            f.write(json.dumps(model))
+
+    def read_notebook_html(self, full_path):
+        return read_notebook_html(full_path)
+
+    #Returns the destination path and the future of the transformation running in the process pool
     def process_notebook_content(self, html, full_path):
-        #Replace notebook content.
-        parser = NotebookParser(html)
-        parser.remove_uncomment_tag()
-        parser.set_environement_metadata()
-        parser.remove_dbdemos_build()
-        #parser.remove_static_settings()
-        parser.hide_commands_and_results()
-        #Moving away from the initial 00-global-setup, remove it once migration is completed
-        requires_global_setup_v2 = False
-        if parser.contains("00-global-setup-v2"):
-            parser.replace_in_notebook('(?:\.\.\/)*_resources\/00-global-setup-v2', './00-global-setup-v2', True)
-            requires_global_setup_v2 = True
-        elif parser.contains("00-global-setup"):
-            raise Exception("00-global-setup is deprecated. Please use 00-global-setup-v2 instead.")
-        with open(full_path, "w") as f:
-            f.write(parser.get_html())
-            return requires_global_setup_v2
+        return full_path, self.submit_to_process_pool(transform_notebook, html, self.max_result_rows, self.max_result_size)
 
     def package_demo(self, demo_conf: DemoConf):
         print(f"packaging demo {demo_conf.name} ({demo_conf.path})")
-        if len(demo_conf.get_notebooks_to_publish()) > 0 and not self.jobBundler.staging_reseted:
-            self.jobBundler.reset_staging_repo()
+        if len(demo_conf.get_notebooks_to_publish()) > 0:
+            self.jobBundler.reset_staging_repo_once()
+        tasks_by_path = {}
         if len(demo_conf.get_notebooks_to_run()) > 0:
             run = self.db.get("2.1/jobs/runs/get", {"run_id": demo_conf.run_id, "include_history": False})
             if 'state' not in run:
                 raise Exception(f"Can't get the last job {self.db.conf.workspace_url}/#job/{demo_conf.job_id}/run/{demo_conf.run_id} state for demo {demo_conf.name}: {run}")
             if run['state']['result_state'] != 'SUCCESS':
                 raise Exception(f"last job {self.db.conf.workspace_url}/#job/{demo_conf.job_id}/run/{demo_conf.run_id} failed for demo {demo_conf.name}. Can't package the demo. {run['state']}")
+            #Repaired runs have one task per attempt, take the latest successful one
+            tasks_by_path = self.get_tasks_by_notebook_path(JobBundler.sort_task_attempts(run['tasks']))
+            #notebooks which didn't change since a previous run aren't executed again, take their result from the previous run
+            tasks_by_path = self.get_tasks_by_notebook_path(demo_conf.previous_task_runs.values(), tasks_by_path)
 
         def download_notebook_html(notebook: DemoNotebook):
-            full_path = demo_conf.get_bundle_path()+"/"+notebook.get_clean_path()
+            full_path = demo_conf.get_bundle_path(self.bundles_folder)+"/"+notebook.get_clean_path()
             print(f"downloading {notebook.path} to {full_path}")
             Path(full_path[:full_path.rindex("/")]).mkdir(parents=True, exist_ok=True)
             if not notebook.pre_run:
                 repo_path = self.jobBundler.conf.get_repo_path()+"/"+demo_conf.path+"/"+notebook.path
                 repo_path = os.path.realpath(repo_path)
                 #print(f"downloading from repo {repo_path}")
-                status = self.db.get("2.0/workspace/get-status", {"path": repo_path})
-                if 'error_code' in status:
-                    raise Exception(f"Couldn't find file {repo_path} in workspace. Check notebook path in bundle conf file. {status['error_code']} - {status['message']}")
+                object_type = archive.get_object_type(repo_path) if archive is not None else None
+                if object_type is None:
+                    object_type = self.get_repo_object_status(repo_path)['object_type']
+                    from_archive = False
+                else:
+                    from_archive = True
                 #We add the type of the object in the conf to know how to load it back.
-                demo_conf.update_notebook_object_type(notebook, status['object_type'])
-                if status['object_type'] == 'NOTEBOOK':
-                    file = self.db.get("2.0/workspace/export", {"path": repo_path, "format": "HTML", "direct_download": False})
-                    if 'error_code' in file:
-                        raise Exception(f"Couldn't find file {repo_path} in workspace. Check notebook path in bundle conf file. {file['error_code']} - {file['message']}")
-                    html = base64.b64decode(file['content']).decode('utf-8')
-                    return self.process_notebook_content(html, full_path+".html")
-                elif status['object_type'] == 'DIRECTORY':
-                    folder = self.db.get("2.0/workspace/export", {"path": repo_path, "format": "AUTO", "direct_download": True})
-                    return self.process_file_content(folder, full_path, ".zip")
-                elif status['object_type'] == 'FILE':
-                    file = self.db.get("2.0/workspace/export", {"path": repo_path, "format": "AUTO", "direct_download": True})
-                    return self.process_file_content(file, full_path)
+                demo_conf.update_notebook_object_type(notebook, object_type)
+                if object_type == 'NOTEBOOK':
+                    #Folder exports only contain the notebook sources, the HTML is exported per notebook
+                    html = self.export_repo_object(repo_path, "HTML", False, f"Couldn't find file {repo_path} in workspace. Check notebook path in bundle conf file.").decode('utf-8')
+                    return self.process_notebook_content(html, full_path)
+                elif object_type == 'DIRECTORY':
+                    if from_archive:
+                        folder = archive.get_directory_zip(repo_path)
+                    else:
+                        folder = self.export_repo_object(repo_path, "AUTO", True, f"Couldn't export folder {repo_path}.")
+                    self.process_file_content(folder, full_path, ".zip")
+                    return None
+                elif object_type == 'FILE':
+                    if from_archive:
+                        file = archive.read_file(repo_path)
+                    else:
+                        file = self.export_repo_object(repo_path, "AUTO", True, f"Couldn't export file {repo_path}.")
+                    self.process_file_content(file, full_path)
+                    return None
                 else:
-                    raise Exception(f"Unsupported object type {status['object_type']} for {repo_path}")
+                    raise Exception(f"Unsupported object type {object_type} for {repo_path}")
             else:
-                tasks = [t for t in run['tasks'] if t['notebook_task']['notebook_path'].endswith(notebook.get_clean_path())]
-                if len(tasks) == 0:
+                task = tasks_by_path.get(notebook.get_clean_path())
+                if task is None:
                     raise Exception(f"couldn't find task for notebook {notebook.path}. Please re-run the job & make sure the stating git repo is synch / reseted.")
-                #print(f"Exporting notebook from job run {tasks[0]['run_id']}")
-                notebook_result = self.db.get("2.1/jobs/runs/export", {'run_id': tasks[0]['run_id'], 'views_to_export': 'ALL'})
-                if "views" not in notebook_result:
-                    raise Exception(f"couldn't get notebook for run {tasks[0]['run_id']} - {notebook.path}. {demo_conf.name}. You probably did a run repair. Please re run the job.")
-                html = notebook_result["views"][0]["content"]
-                return self.process_notebook_content(html, full_path+".html")
+                #print(f"Exporting notebook from job run {task['run_id']}")
+                html = self.export_run_notebook_html(task['run_id'], notebook, demo_conf)
+                return self.process_notebook_content(html, full_path)
             
 
         requires_global_setup_v2 = False
         
-        # Process notebooks in parallel with max 5 workers
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            # Submit all notebooks for processing and collect futures
-            futures = [executor.submit(download_notebook_html, notebook) for notebook in demo_conf.notebooks]
-            
-            # Process results as they complete
-            for future in futures:
-                rv1 = future.result()
-                if rv1:
-                    requires_global_setup_v2 = True
+        # Download notebooks through the shared export queue, the transformation runs in the process pool
+        executor = self.get_export_executor()
+        with tempfile.TemporaryDirectory() as tmp_folder:
+            archive = executor.submit(self.get_demo_archive, demo_conf, tmp_folder).result()
+            try:
+                # Submit all notebooks for processing and collect futures
+                futures = [executor.submit(download_notebook_html, notebook) for notebook in demo_conf.notebooks]
+
+                # Save the transformed notebooks as they complete. All the demo notebooks must be saved before building the minisite.
+                for future in as_completed(futures):
+                    transformation = future.result()
+                    if transformation is not None:
+                        full_path, transformed = transformation
+                        split_html, rv1 = transformed.result()
+                        self.write_notebook(split_html, full_path)
+                        if rv1:
+                            requires_global_setup_v2 = True
+            finally:
+                if archive is not None:
+                    archive.close()
 
         #Add the global notebook if required
         if requires_global_setup_v2:
             init_notebook = DemoNotebook("_resources/00-global-setup-v2", "Global init", "Global init")
             demo_conf.add_notebook(init_notebook)
-            file = self.db.get("2.0/workspace/export", {"path": self.jobBundler.conf.get_repo_path() +"/"+ init_notebook.path, "format": "HTML", "direct_download": False})
-            if 'error_code' in file:
-                raise Exception(f"Couldn't find file '{self.jobBundler.conf.get_repo_path()}/{init_notebook.path}' in workspace. Check notebook path in bundle conf file. {file['error_code']} - {file['message']}")
-            html = base64.b64decode(file['content']).decode('utf-8')
-            with open(demo_conf.get_bundle_path() + "/" + init_notebook.path+".html", "w") as f:
-                f.write(html)
+            #Same file for all the demos, downloaded once thanks to the export cache
+            init_notebook_path = self.jobBundler.conf.get_repo_path() +"/"+ init_notebook.path
+            html = executor.submit(self.export_repo_object, init_notebook_path, "HTML", False, f"Couldn't find file '{init_notebook_path}' in workspace. Check notebook path in bundle conf file.").result().decode('utf-8')
+            self.save_notebook_html(html, demo_conf.get_bundle_path(self.bundles_folder) + "/" + init_notebook.path)
 
     def get_html_menu(self, path: str, title: str, description: str, notebook_link: str):
         # Add padding for subfolder for better visualization
@@ -162,6 +491,27 @@ class Packager:
                     <div class="small notebook_description">{description}</div>
                 </a>"""
 
+    def get_index_template(self):
+        if self.index_template is None:
+            self.index_template = pkg_resources.resource_string("dbdemos", "template/index.html").decode('UTF-8')
+        return self.index_template
+
+    #Source hash of the minisite pages, to only render the pages that changed since the last build
+    def get_minisite_manifest_path(self, demo_conf: DemoConf):
+        return f"{self.cache_folder}/minisite/{demo_conf.name}.json"
+
+    def load_minisite_manifest(self, demo_conf: DemoConf):
+        if self.cache_folder is None or not Path(self.get_minisite_manifest_path(demo_conf)).exists():
+            return {}
+        with open(self.get_minisite_manifest_path(demo_conf), "r") as f:
+            return json.loads(f.read())
+
+    def save_minisite_manifest(self, demo_conf: DemoConf, manifest):
+        if self.cache_folder is not None:
+            Path(self.get_minisite_manifest_path(demo_conf)).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.get_minisite_manifest_path(demo_conf), "w") as f:
+                f.write(json.dumps(manifest))
+
     #Build HTML pages with index.
     # - If the notebook is pre-run, load them from the install_package folder
     # - If the notebook isn't pre-run, download them from the pacakge workspace as HTML (ex: can't run DLT pipelines)
@@ -169,20 +519,23 @@ class Packager:
         notebooks_to_publish = demo_conf.get_notebooks_to_publish()
         print(f"Build minisite for demo {demo_conf.name} ({demo_conf.path}) - {notebooks_to_publish}")
         minisite_path = demo_conf.get_minisite_path()
+        assets_folder = minisite_path+"/"+Packager.MINISITE_ASSETS_FOLDER
+        Path(assets_folder).mkdir(parents=True, exist_ok=True)
+        previous_manifest = self.load_minisite_manifest(demo_conf)
+        manifest = {}
         html_menu = {}
+        pages = []
         previous_folder = ""
         for notebook in notebooks_to_publish:
-            Path(minisite_path).mkdir(parents=True, exist_ok=True)
             full_path = minisite_path+"/"+notebook.get_clean_path()+".html"
             Path(full_path[:full_path.rindex("/")]).mkdir(parents=True, exist_ok=True)
-            with open(demo_conf.get_bundle_path()+"/"+notebook.get_clean_path()+".html", "r") as f:
-                parser = NotebookParser(f.read())
-            with open(full_path, "w") as f:
-                parser.remove_robots_meta()
-                parser.add_cell_as_html_for_seo()
-                parser.remove_delete_cell()
-                parser.add_javascript_to_minisite_relative_links()
-                f.write(parser.get_html())
+            notebook_path = demo_conf.get_bundle_path(self.bundles_folder)+"/"+notebook.get_clean_path()
+            assets_src = "../"*notebook.get_clean_path().count("/") + Packager.MINISITE_ASSETS_FOLDER + "/"
+            #the model file contains the shell id, the page only changes if the model, the shell or the rendering changes
+            with open(notebook_path+HtmlShell.MODEL_EXTENSION, "rb") as f:
+                manifest[full_path] = ExportCache.get_key(hashlib.sha1(f.read()).hexdigest(), assets_src, Packager.MINISITE_VERSION)
+            if previous_manifest.get(full_path) != manifest[full_path] or not Path(full_path).exists():
+                pages.append(self.submit_to_process_pool(build_minisite_page, notebook_path, full_path, assets_folder, assets_src))
             menu_entry = ""
             title = notebook.get_clean_path()
             i = title.rfind("/")
@@ -201,8 +554,13 @@ class Packager:
             menu_entry += self.get_html_menu(notebook.get_clean_path(), title, notebook.description, iframe_root_src+notebook.get_clean_path()+".html")
             html_menu[notebook.get_clean_path()] = menu_entry
 
+        for page in pages:
+            page.result()
+        print(f"{len(pages)} minisite pages rendered for {demo_conf.name}, {len(notebooks_to_publish)-len(pages)} unchanged")
+        self.save_minisite_manifest(demo_conf, manifest)
+
         #create the index file
-        template = pkg_resources.resource_string("dbdemos", "template/index.html").decode('UTF-8')
+        template = self.get_index_template()
         #Sort the menu to display  proper order.
         menu_keys = [*html_menu]
         menu_keys.sort()
@@ -210,8 +568,8 @@ class Packager:
         template = template.replace("{{TITLE}}", demo_conf.title)
         template = template.replace("{{DESCRIPTION}}", demo_conf.description)
         template = template.replace("{{DEMO_NAME}}", demo_conf.name)
-        with open(minisite_path+"/index.html", "w") as f:
-            f.write(template)
-        #dump the conf
-        with open(demo_conf.get_bundle_root_path()+"/conf.json", "w") as f:
+        write_minisite_file(minisite_path+"/index.html", template)
+
+    def save_bundle_conf(self, demo_conf: DemoConf):
+        with open(demo_conf.get_bundle_root_path(self.bundles_folder)+"/conf.json", "w") as f:
             f.write(json.dumps(demo_conf.json_conf))
\ No newline at end of file
@@ -0,0 +1,59 @@
+class PathTrie:
+    """
+    Set of repo file paths indexed by folder, to find which demos contain changes without scanning all the changed files for every demo.
+    """
+    #notebook files, the demo notebook paths don't have the extension
+    NOTEBOOK_EXTENSIONS = [".py", ".sql", ".scala", ".r", ".ipynb"]
+
+    #complete=False when the paths are unknown (ex: truncated github diff): the trie then contains every prefix
+    def __init__(self, paths = [], complete: bool = True):
+        self.root = {}
+        self.paths = []
+        self.complete = complete
+        for path in paths:
+            self.add(path)
+
+    @staticmethod
+    def split(path: str):
+        return [p for p in path.strip("/").split("/") if p not in ["", "."]]
+
+    def add(self, path: str):
+        node = self.root
+        for part in PathTrie.split(path):
+            node = node.setdefault(part, {})
+        #"/" can't be a path part, used to flag the end of a path
+        node["/"] = path
+        self.paths.append(path)
+
+    #All the paths under the prefix folder
+    def list(self, prefix: str):
+        node = self.root
+        for part in PathTrie.split(prefix):
+            if part not in node:
+                return []
+            node = node[part]
+        paths = []
+        nodes = [node]
+        while len(nodes) > 0:
+            node = nodes.pop()
+            for name, child in node.items():
+                if name == "/":
+                    paths.append(child)
+                else:
+                    nodes.append(child)
+        return sorted(paths)
+
+    #True if a path is the prefix itself, is under the prefix folder, or is the prefix notebook file (01-notebook => 01-notebook.py)
+    def contains(self, prefix: str):
+        if not self.complete:
+            return True
+        parts = PathTrie.split(prefix)
+        if len(parts) == 0:
+            return len(self.paths) > 0
+        node = self.root
+        for part in parts[:-1]:
+            if part not in node:
+                return False
+            node = node[part]
+        return parts[-1] in node or any(parts[-1] + ext in node and "/" in node[parts[-1] + ext]
+                                        for ext in PathTrie.NOTEBOOK_EXTENSIONS)
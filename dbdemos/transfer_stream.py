@@ -0,0 +1,49 @@
+import io
+import time
+
+
+class TransferStream(io.RawIOBase):
+    """
+    Read-only stream over a chunked download (ex: requests iter_content), used to upload a file while it's being
+    downloaded instead of loading it in memory. Only the current download chunk is kept in memory.
+    """
+    #checksum: optional hashlib object updated with the content read
+    def __init__(self, chunks, length: int = None, checksum = None):
+        self.chunks = iter(chunks)
+        self.length = length
+        self.checksum = checksum
+        self.buffer = memoryview(b"")
+        self.position = 0
+        self.start_time = time.time()
+
+    #Lets requests send a Content-Length instead of a chunked body when the size is known
+    def __len__(self):
+        return self.length if self.length is not None else 0
+
+    #an unknown (0) length must not make the stream falsy
+    def __bool__(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def readinto(self, b):
+        while len(self.buffer) == 0:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.buffer = memoryview(chunk)
+            if self.checksum is not None:
+                self.checksum.update(chunk)
+        size = min(len(b), len(self.buffer))
+        b[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        self.position += size
+        return size
+
+    #bytes per second since the stream was created
+    def get_throughput(self):
+        return self.position / max(time.time() - self.start_time, 0.001)
@@ -0,0 +1,71 @@
+import collections
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from databricks.sdk import WorkspaceClient
+
+
+class UnityCatalogPreflight:
+    """
+    Resolves the Unity Catalog objects used by a demo install (catalog, schema, volume, tables) in one concurrent batch,
+    and caches the answers for the rest of the install. Objects created or deleted by the installer must be updated with set().
+    """
+    CATALOG = "catalog"
+    SCHEMA = "schema"
+    VOLUME = "volume"
+    TABLE = "table"
+
+    def __init__(self, ws: WorkspaceClient, max_workers: int = 10):
+        self.ws = ws
+        self.max_workers = max_workers
+        self.objects = {}
+        self.objects_lock = threading.Lock()
+
+    def resolve(self, catalog: str = None, schema: str = None, volume: str = None, tables: list = None, refresh: bool = False):
+        objects = []
+        if catalog is not None:
+            objects.append((UnityCatalogPreflight.CATALOG, catalog))
+            if schema is not None:
+                objects.append((UnityCatalogPreflight.SCHEMA, f"{catalog}.{schema}"))
+                if volume is not None:
+                    objects.append((UnityCatalogPreflight.VOLUME, f"{catalog}.{schema}.{volume}"))
+        #table patterns (ex: catalog.schema.*) aren't tables
+        objects += [(UnityCatalogPreflight.TABLE, t) for t in tables or [] if "*" not in t]
+        if refresh:
+            with self.objects_lock:
+                for o in objects:
+                    self.objects.pop(o, None)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            collections.deque(executor.map(lambda o: self.get(*o), objects))
+
+    def get(self, object_type: str, name: str):
+        """returns (object, error). object is None if it doesn't exist or can't be read, error is the SDK exception"""
+        key = (object_type, name)
+        with self.objects_lock:
+            if key in self.objects:
+                return self.objects[key]
+        try:
+            result = (self.fetch(object_type, name), None)
+        except Exception as e:
+            result = (None, e)
+        with self.objects_lock:
+            return self.objects.setdefault(key, result)
+
+    def fetch(self, object_type: str, name: str):
+        if object_type == UnityCatalogPreflight.CATALOG:
+            return self.ws.catalogs.get(name)
+        elif object_type == UnityCatalogPreflight.SCHEMA:
+            return self.ws.schemas.get(name)
+        elif object_type == UnityCatalogPreflight.VOLUME:
+            return self.ws.volumes.read(name)
+        elif object_type == UnityCatalogPreflight.TABLE:
+            return self.ws.tables.get(name)
+        raise Exception(f"Unknown unity catalog object type {object_type}")
+
+    def exists(self, object_type: str, name: str):
+        return self.get(object_type, name)[0] is not None
+
+    #obj: the object created by the installer, or None if it was deleted
+    def set(self, object_type: str, name: str, obj):
+        with self.objects_lock:
+            self.objects[(object_type, name)] = (obj, None)
@@ -0,0 +1,74 @@
+import io
+import threading
+import zipfile
+
+
+class WorkspaceArchive:
+    """
+    Local zip export (format AUTO, direct_download) of a workspace folder.
+    Gives the object type and content of the folder objects from the archive listing,
+    instead of one get-status + export call per object.
+    """
+    NOTEBOOK_EXTENSIONS = [".py", ".sql", ".scala", ".r"]
+    NOTEBOOK_HEADERS = [b"# Databricks notebook source", b"-- Databricks notebook source", b"// Databricks notebook source"]
+
+    def __init__(self, zip_path: str, folder_path: str):
+        self.folder_path = folder_path.rstrip("/")
+        self.zip = zipfile.ZipFile(zip_path)
+        self.lock = threading.Lock()
+        names = [n for n in self.zip.namelist() if not n.endswith("/")]
+        #Folder exports can be wrapped in a root folder named after the exported folder
+        self.root_prefix = ""
+        folder_name = self.folder_path.split("/")[-1]+"/"
+        if len(names) > 0 and all(n.startswith(folder_name) for n in names):
+            self.root_prefix = folder_name
+        self.entries = {n[len(self.root_prefix):]: n for n in names}
+
+    def close(self):
+        self.zip.close()
+
+    def get_relative_path(self, path: str):
+        if not path.startswith(self.folder_path+"/"):
+            return None
+        return path[len(self.folder_path)+1:]
+
+    def read_entry(self, name: str, size: int = -1):
+        with self.lock:
+            with self.zip.open(self.entries[name]) as f:
+                return f.read(size)
+
+    def get_notebook_entry(self, relative_path: str):
+        for extension in WorkspaceArchive.NOTEBOOK_EXTENSIONS:
+            name = relative_path + extension
+            if name in self.entries:
+                header = self.read_entry(name, 64).lstrip(b"\xef\xbb\xbf")
+                if any(header.startswith(h) for h in WorkspaceArchive.NOTEBOOK_HEADERS):
+                    return name
+        return None
+
+    #Returns NOTEBOOK, FILE or DIRECTORY (same as workspace get-status object_type), None if the path isn't in the archive.
+    def get_object_type(self, path: str):
+        relative_path = self.get_relative_path(path)
+        if relative_path is None:
+            return None
+        if self.get_notebook_entry(relative_path) is not None:
+            return "NOTEBOOK"
+        if relative_path in self.entries:
+            return "FILE"
+        if any(n.startswith(relative_path+"/") for n in self.entries):
+            return "DIRECTORY"
+        return None
+
+    def read_file(self, path: str):
+        return self.read_entry(self.get_relative_path(path))
+
+    #Same zip as the workspace AUTO export of the sub folder
+    def get_directory_zip(self, path: str):
+        relative_path = self.get_relative_path(path)
+        root_prefix = relative_path.split("/")[-1]+"/" if self.root_prefix != "" else ""
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, "w", zipfile.ZIP_DEFLATED) as z:
+            for name in sorted(self.entries):
+                if name.startswith(relative_path+"/"):
+                    z.writestr(root_prefix+name[len(relative_path)+1:], self.read_entry(name))
+        return content.getvalue()
@@ -0,0 +1,39 @@
+from dbdemos.bundle_config import BundleConfig
+
+CONFIG = '''# Databricks notebook source
+# MAGIC %md
+# MAGIC ## Demo bundle configuration
+
+# COMMAND ----------
+
+{
+  "name": "demo",
+  "category": "data-engineering",
+  "title": "Demo",
+  "description": """multi-line
+  description""",
+  "bundle": True,
+  "notebooks": [
+    {"path": "01-intro", "title": "Intro", "description": "intro", "pre_run": False, "publish_on_website": true, "warehouse_id": None}
+  ]
+}
+'''
+
+
+def test_parse():
+    conf = BundleConfig.parse(CONFIG, "bundle_config")
+    assert conf["description"] == "multi-line\n  description"
+    assert conf["bundle"] is True
+    assert conf["notebooks"][0]["publish_on_website"] is True
+    assert BundleConfig.validate(conf) == []
+    try:
+        BundleConfig.parse('{"name": get_name()}', "bundle_config")
+        assert False
+    except Exception as e:
+        assert "bundle_config" in str(e)
+
+
+def test_validate():
+    errors = BundleConfig.validate({"name": "demo", "title": 1, "description": "", "notebooks": [{"path": "a", "title": "a", "description": "", "pre_run": "yes"}]})
+    assert errors == ["category is required", "title should be a str, got int",
+                      "notebooks[0].pre_run should be a bool, got str", "notebooks[0].publish_on_website is required"]
@@ -0,0 +1,35 @@
+from pathlib import Path
+from dbdemos.bundle_pack import BundlePack
+
+
+def test_create_and_read(tmp_path):
+    files = {"conf.json": b"{}",
+             "install_package/01-notebook.model.json": b'{"shell": "abc", "model": "xyz"}' * 100,
+             "install_package/_resources/00-setup.model.json": b'{"shell": "abc"}',
+             "dashboards/sales.lvdash.json": b'{"pages": []}'}
+    for name, content in files.items():
+        Path(tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        Path(tmp_path / name).write_bytes(content)
+    packed = BundlePack.create(str(tmp_path), str(tmp_path / BundlePack.FILE_NAME), exclude=["conf.json"])
+    assert len(packed) == 3
+    pack = BundlePack(str(tmp_path / BundlePack.FILE_NAME))
+    for name in packed:
+        assert pack.read(name) == files[name]
+    assert not pack.exists("conf.json")
+    assert pack.isdir("install_package/_resources")
+    assert pack.listdir() == ["dashboards", "install_package"]
+    assert pack.listdir("install_package") == ["01-notebook.model.json", "_resources"]
+    pack.close()
+
+
+def test_open_stream(tmp_path):
+    content = bytes(range(256)) * 2000
+    Path(tmp_path / "data.bin").write_bytes(content)
+    BundlePack.create(str(tmp_path), str(tmp_path / BundlePack.FILE_NAME))
+    pack = BundlePack(str(tmp_path / BundlePack.FILE_NAME))
+    with pack.open("data.bin") as f:
+        chunks = list(iter(lambda: f.read(10000), b""))
+    assert b"".join(chunks) == content
+    assert all(len(c) <= 10000 for c in chunks)
+    assert pack.read("data.bin") == content
+    pack.close()
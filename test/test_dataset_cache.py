@@ -0,0 +1,44 @@
+import os
+import tempfile
+from dbdemos.dataset_cache import DatasetCache
+
+
+def download(content):
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(content)
+    return write
+
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = DatasetCache(folder, max_size=25)
+        key_a = DatasetCache.get_dataset_key("https://bucket/a.parquet", '"etag-a"')
+        key_b = DatasetCache.get_dataset_key("https://bucket/b.parquet", size=10)
+        with cache.use_entry(key_a, download(b"a"*10)) as path_a:
+            pass
+        with cache.use_entry(key_b, download(b"b"*10)) as path_b:
+            pass
+        os.utime(path_a, (0, 0))
+        os.utime(path_b, (1, 1))
+        #cache hit: a becomes the most recently used
+        with cache.use_entry(key_a, download(b"x")) as path:
+            assert path == path_a
+            with open(path_a, "rb") as f:
+                assert f.read() == b"a"*10
+        with cache.use_entry(DatasetCache.get_dataset_key("https://bucket/c.parquet", size=10), download(b"c"*10)):
+            pass
+        assert os.path.exists(path_a) and not os.path.exists(path_b)
+
+
+def test_entry_in_use_not_evicted():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = DatasetCache(folder, max_size=15)
+        key_a = DatasetCache.get_dataset_key("https://bucket/a.parquet", size=10)
+        with cache.use_entry(key_a, download(b"a"*10)) as path_a:
+            os.utime(path_a, (0, 0))
+            #another transfer exceeds the cache size while a is being uploaded
+            with cache.use_entry(DatasetCache.get_dataset_key("https://bucket/b.parquet", size=10), download(b"b"*10)) as path_b:
+                pass
+            #the least recently used entry is in use: the next one is evicted instead
+            assert os.path.exists(path_a) and not os.path.exists(path_b)
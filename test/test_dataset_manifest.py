@@ -0,0 +1,13 @@
+from dbdemos.dataset_manifest import DatasetManifest
+
+
+def test_list_files():
+    manifest = DatasetManifest({"version": "abc", "files": {
+        "fsi/fraud/customers/part-0.parquet": {"size": 10, "sha": "s0"},
+        "fsi/fraud/customers/part-1.parquet": {"size": 20, "sha": "s1"},
+        "fsi/fraud/customers/sub/part-2.parquet": {"size": 30, "sha": "s2"},
+        "fsi/fraud/customers_v2/part-0.parquet": {"size": 40, "sha": "s3"}}})
+    files = manifest.list_files("/fsi/fraud/customers/")
+    assert [f["name"] for f in files] == ["part-0.parquet", "part-1.parquet"]
+    assert files[1] == {"path": "fsi/fraud/customers/part-1.parquet", "name": "part-1.parquet", "size": 20, "sha": "s1"}
+    assert DatasetManifest.get_url(files[0]["path"]) == "https://dbdemos-dataset.s3.amazonaws.com/fsi/fraud/customers/part-0.parquet"
@@ -0,0 +1,41 @@
+import os
+import time
+from dbdemos.export_cache import ExportCache
+
+
+def test_get_or_fetch(tmp_path):
+    cache = ExportCache(str(tmp_path))
+    key = ExportCache.get_key("/Repos/dbdemos/dbdemos-notebooks/demo/01-notebook", "commit_a", "HTML")
+    assert key != ExportCache.get_key("/Repos/dbdemos/dbdemos-notebooks/demo/01-notebook", "commit_b", "HTML")
+    assert cache.get(key) is None
+    calls = []
+    def fetch():
+        calls.append(1)
+        return b"content"
+    assert cache.get_or_fetch(key, fetch) == b"content"
+    #second call is served from the cache folder, even with a new cache instance
+    assert ExportCache(str(tmp_path)).get_or_fetch(key, fetch) == b"content"
+    assert len(calls) == 1
+
+
+def test_evict(tmp_path):
+    cache = ExportCache(str(tmp_path), max_size=25, max_age=3600)
+    keys = [ExportCache.get_key("runs/export", run_id) for run_id in range(4)]
+    for key in keys:
+        cache.put(key, b"x"*10)
+    #not used for more than max_age
+    os.utime(cache.get_path(keys[0]), (0, 0))
+    os.utime(cache.get_path(keys[1]), (time.time()-60, time.time()-60))
+    os.utime(cache.get_path(keys[2]), (time.time()-30, time.time()-30))
+    #cache hit: the entry becomes the most recently used
+    assert cache.get(keys[1]) == b"x"*10
+    cache.evict()
+    #expired, then least recently used above max_size
+    assert [cache.get(key) is not None for key in keys] == [False, True, False, True]
+
+
+def test_locks_released(tmp_path):
+    cache = ExportCache(str(tmp_path))
+    for run_id in range(10):
+        cache.get_or_fetch(ExportCache.get_key("runs/export", run_id), lambda: b"content")
+    assert cache.locks == {}
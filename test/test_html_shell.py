@@ -0,0 +1,42 @@
+import json
+import tempfile
+from dbdemos.html_shell import HtmlShell
+from dbdemos.notebook_parser import NotebookParser
+
+
+def test_split_and_assemble():
+    shells = set()
+    for template in ["LICENSE", "NOTICE", "README"]:
+        html = HtmlShell.read(f"../dbdemos/template/{template}", "../dbdemos/shells")
+        shell_id, shell, model = HtmlShell.split(html)
+        shells.add(shell_id)
+        assert model["title"] == f"{template} - Databricks"
+        assert len(model["model"]) < len(html) / 10
+        assert HtmlShell.assemble(shell, model) == html
+        assert NotebookParser(HtmlShell.assemble(shell, model)).content == NotebookParser(html).content
+    #all the templates are exported with the same viewer version and share the same shell
+    assert len(shells) == 1
+
+
+def test_extract_static_settings():
+    html = HtmlShell.read("../dbdemos/template/LICENSE", "../dbdemos/shells")
+    page, asset_name, asset_content = HtmlShell.extract_static_settings(html, "../assets/")
+    assert asset_content.startswith("window.__STATIC_SETTINGS__")
+    assert f'<script src="../assets/{asset_name}"></script>' in page
+    assert len(page) < len(html) / 10
+    assert HtmlShell.extract_static_settings(page, "../assets/") == (page, None, None)
+
+
+def test_read_bundled_notebook():
+    #bundled notebooks are saved as model files, the page is rebuilt with the shared shell before parsing
+    html = HtmlShell.read("../dbdemos/template/LICENSE", "../dbdemos/shells")
+    shell_id, shell, model = HtmlShell.split(html)
+    with tempfile.TemporaryDirectory() as folder:
+        with open(f"{folder}/{shell_id}.html", "w") as f:
+            f.write(shell)
+        with open(f"{folder}/LICENSE{HtmlShell.MODEL_EXTENSION}", "w") as f:
+            f.write(json.dumps(model))
+        p = NotebookParser(HtmlShell.read(f"{folder}/LICENSE", folder))
+    assert p.content == NotebookParser(html).content
+    p.replace_in_notebook("Databricks", "Databricks-test")
+    assert p.contains("Databricks-test")
@@ -0,0 +1,60 @@
+from dbdemos.instance_pool import InstancePoolManager
+
+
+def test_get_cloud():
+    assert InstancePoolManager.get_cloud("https://adb-123.4.azuredatabricks.net") == "AZURE"
+    assert InstancePoolManager.get_cloud("https://123.4.gcp.databricks.com") == "GCP"
+    assert InstancePoolManager.get_cloud("https://e2-demo-tools.cloud.databricks.com") == "AWS"
+
+
+def test_get_min_idle_instances():
+    assert InstancePoolManager.get_min_idle_instances(12) == 12
+    assert InstancePoolManager.get_min_idle_instances(12, 5) == 5
+    assert InstancePoolManager.get_min_idle_instances(100) == InstancePoolManager.MAX_IDLE_INSTANCES
+
+
+class FakeConf:
+    def __init__(self, org_pool_id = None):
+        self.workspace_url = "https://e2-demo-tools.cloud.databricks.com"
+        self.org_pool_id = org_pool_id
+
+    def get_org_demo_pool(self):
+        return self.org_pool_id
+
+
+class FakeDB:
+    def __init__(self, pools, org_pool_id = None):
+        self.pools = pools
+        self.posts = []
+        self.conf = FakeConf(org_pool_id)
+
+    def get(self, path, params = {}, print_auth_error = True):
+        if path == "2.0/instance-pools/get":
+            return next((p for p in self.pools if p["instance_pool_id"] == params["instance_pool_id"]), {"error_code": "RESOURCE_DOES_NOT_EXIST"})
+        return {"instance_pools": self.pools}
+
+    def post(self, path, json = {}):
+        self.posts.append(path)
+        return {}
+
+
+def test_cloud_normalised():
+    manager = InstancePoolManager(FakeDB([]), "Azure")
+    assert manager.get_node_type() == InstancePoolManager.NODE_TYPES["AZURE"]
+    assert InstancePoolManager(FakeDB([]), "unknown").get_or_create_pool() is None
+
+
+def test_get_pool_without_resize():
+    pool = {"instance_pool_name": "dbdemos-pool-i3.xlarge", "instance_pool_id": "pool-1", "node_type_id": "i3.xlarge",
+            "min_idle_instances": 5, "custom_tags": InstancePoolManager.POOL_TAGS}
+    db = FakeDB([pool])
+    assert InstancePoolManager(db, "AWS").get_or_create_pool() == "pool-1"
+    assert db.posts == []
+
+
+def test_adopt_org_pool():
+    #existing internal pool, without the dbdemos name & tags
+    pool = {"instance_pool_name": "field-eng-pool", "instance_pool_id": "org-pool", "node_type_id": "i3.xlarge", "min_idle_instances": 0}
+    db = FakeDB([pool], org_pool_id="org-pool")
+    assert InstancePoolManager(db, "AWS").get_or_create_pool() == "org-pool"
+    assert db.posts == []
@@ -0,0 +1,62 @@
+from dbdemos.job_bundler import JobBundler
+
+
+def test_get_estimated_completion():
+    #longest first on 2 slots: [60] and [30, 20, 10]
+    assert JobBundler.get_estimated_completion([10, 60, 20, 30], 2) == 60
+    assert JobBundler.get_estimated_completion([10, 60, 20, 30], 1) == 120
+    assert JobBundler.get_estimated_completion([10, 60, 20, 30]) == 60
+    assert JobBundler.get_estimated_completion([]) == 0
+
+
+def test_task_graph():
+    from dbdemos.conf import DemoNotebook
+    nb = DemoNotebook("nb", "nb", "nb")
+    #c depends on d, declared after it in the notebook list
+    tasks = [("a", nb, []), ("b", nb, ["a"]), ("c", nb, ["a", "d"]), ("d", nb, [])]
+    assert [t[0] for t in JobBundler.sort_tasks(tasks)] == ["a", "b", "d", "c"]
+    assert JobBundler.get_dag_width(JobBundler.sort_tasks(tasks)) == 2
+    assert JobBundler.get_dag_width([("a", nb, []), ("b", nb, ["a"])]) == 1
+    try:
+        JobBundler.sort_tasks([("a", nb, ["b"]), ("b", nb, ["a"])])
+        assert False
+    except Exception as e:
+        assert "Circular" in str(e)
+
+
+def test_get_active_run_ids():
+    class FakeDB:
+        def __init__(self):
+            self.calls = 0
+        def get(self, path, params = {}):
+            self.calls += 1
+            pages = {None: {"runs": [{"run_id": 1}, {"run_id": 2}], "has_more": True, "next_page_token": "p2"},
+                     "p2": {"runs": [{"run_id": 3}], "has_more": True, "next_page_token": "p3"},
+                     "p3": {"runs": [{"run_id": 4}], "has_more": False}}
+            return pages[params.get("page_token")]
+    bundler = JobBundler.__new__(JobBundler)
+    bundler.db = FakeDB()
+    assert bundler.get_active_run_ids({2, 3}) == {2, 3}
+    #all the watched runs found on the second page: the last page isn't listed
+    assert bundler.db.calls == 2
+    assert bundler.get_active_run_ids({2, 5}) == {2}
+
+
+def test_get_changed_files_from_github_truncated():
+    compare_files = [{"filename": f"demo-a/file{i}.py"} for i in range(JobBundler.GITHUB_COMPARE_MAX_FILES)]
+    responses = {
+        ("compare", None): {"total_commits": 2, "commits": [{"sha": "c1"}, {"sha": "c2"}], "files": compare_files},
+        ("compare", 1): {"commits": [{"sha": "c1"}, {"sha": "c2"}]},
+        ("c1", 1): {"files": compare_files},
+        #a full page of files: the next page is listed
+        ("c1", 2): {"files": [{"filename": "demo-a/other.py"}]},
+        ("c2", 1): {"files": [{"filename": "demo-b/moved.py", "previous_filename": "demo-c/moved.py"}]}
+    }
+    bundler = JobBundler.__new__(JobBundler)
+    bundler.get_github = lambda url, params = None: responses[("compare" if "/compare/" in url else url.split("/")[-1], (params or {}).get("page"))]
+    files = bundler.get_changed_files_from_github("databricks-demos", "dbdemos-notebooks", "base", "head")
+    assert len(files) == JobBundler.GITHUB_COMPARE_MAX_FILES + 3
+    assert "demo-b/moved.py" in files and "demo-c/moved.py" in files
+    #below the cap, the compare file list is complete whatever the number of commits
+    responses[("compare", None)] = {"total_commits": 400, "commits": [{"sha": "c1"}], "files": [{"filename": "demo-a/file0.py"}]}
+    assert bundler.get_changed_files_from_github("databricks-demos", "dbdemos-notebooks", "base", "head") == ["demo-a/file0.py"]
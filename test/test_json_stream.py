@@ -0,0 +1,26 @@
+import io
+import json
+from dbdemos.json_stream import JsonStringExtractor
+
+
+def test_extract_first_view_content():
+    content = '<html>\n"quoted" \\ é ☃ 😀 \t</html>' * 100
+    run_export = {"notebook": {"ids": [1, 2.5, True, None, "a\\\"b"]},
+                  "views": [{"name": "01-notebook", "content": content, "type": "NOTEBOOK"}, {"content": "second view"}]}
+    for ensure_ascii in [True, False]:
+        data = json.dumps(run_export, ensure_ascii=ensure_ascii).encode('utf-8')
+        #chunks can split escape sequences and multi-bytes characters
+        for chunk_size in [1, 3, 7, 1024]:
+            output = io.StringIO()
+            extractor = JsonStringExtractor(["views", 0, "content"], output)
+            for i in range(0, len(data), chunk_size):
+                if extractor.feed(data[i:i+chunk_size]):
+                    break
+            assert extractor.close()
+            assert output.getvalue() == content
+
+
+def test_missing_content():
+    extractor = JsonStringExtractor(["views", 0, "content"], io.StringIO())
+    extractor.feed(b'{"error_code": "INVALID_STATE", "message": "Run not found"}')
+    assert not extractor.close()
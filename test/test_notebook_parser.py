@@ -3,15 +3,15 @@ import base64
 import urllib.parse
 import json
 from dbdemos.notebook_parser import NotebookParser
+from dbdemos.html_shell import HtmlShell
 
 
 
 def test_close_cell():
-    with open("../dbdemos/template/LICENSE.html", "r") as f:
-        p = NotebookParser(f.read())
-        p.hide_commands_and_results()
-        #print(p.get_html())
-        #p.hide_command_result(0)
+    p = NotebookParser(HtmlShell.read("../dbdemos/template/LICENSE", "../dbdemos/shells"))
+    p.hide_commands_and_results()
+    #print(p.get_html())
+    #p.hide_command_result(0)
 
 
 def test_automl():
@@ -41,6 +41,18 @@ def test_parser_contains():
         #print(p.get_html())
         #p.hide_command_result(0)
 
+def test_cap_results():
+    p = NotebookParser(HtmlShell.read("../dbdemos/template/LICENSE", "../dbdemos/shells"))
+    content = json.loads(p.content)
+    content["commands"][0]["results"] = {"type": "table", "data": [[i, "row"] for i in range(100)]}
+    content["commands"][1]["results"] = {"type": "html", "data": "<img src='data:image/png;base64,"+"A"*10000+"'/>"}
+    p.content = json.dumps(content)
+    p.cap_results(max_rows=5, max_result_size=1000)
+    content = json.loads(p.content)
+    assert len(content["commands"][0]["results"]["data"]) == 5
+    assert content["commands"][1]["results"] is None
+    NotebookParser(p.get_html())
+
 def test_parser_notebook():
 
     with open("../dbdemos/bundles/lakehouse-retail-c360/install_package/01-Data-ingestion/01.1-DLT-churn-SQL.html", "r") as f:
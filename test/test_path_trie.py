@@ -0,0 +1,33 @@
+from dbdemos.path_trie import PathTrie
+
+
+def test_contains():
+    trie = PathTrie(["product_demos/Unity-Catalog/uc-05-upgrade/00-Upgrade.py",
+                     "demo-retail/lakehouse-retail-c360/_resources/01-load-data.py",
+                     "_resources/00-global-setup-v2.py",
+                     "README.md"])
+    assert trie.contains("product_demos/Unity-Catalog/uc-05-upgrade")
+    assert trie.contains("product_demos/Unity-Catalog/uc-05-upgrade/")
+    assert trie.contains("product_demos/Unity-Catalog")
+    assert not trie.contains("product_demos/Unity-Catalog/uc-05")
+    assert not trie.contains("product_demos/Unity-Catalog/uc-01-acl")
+    #notebook paths don't have the file extension
+    assert trie.contains("_resources/00-global-setup-v2")
+    assert trie.contains("demo-retail/lakehouse-retail-c360/_resources/01-load-data")
+    assert not trie.contains("demo-retail/lakehouse-retail-c360/_resources/01-load")
+    assert trie.contains("")
+    assert not PathTrie().contains("")
+
+
+def test_list():
+    trie = PathTrie(["demo-retail/c360/01-ingest.py", "demo-retail/c360/_resources/00-setup.py", "demo-retail/c360-v2/01-ingest.py"])
+    assert trie.list("demo-retail/c360") == ["demo-retail/c360/01-ingest.py", "demo-retail/c360/_resources/00-setup.py"]
+    assert trie.list("demo-retail/other") == []
+    assert len(trie.list("")) == 3
+
+
+def test_contains_sibling_files():
+    trie = PathTrie(["demo/foo.md", "demo/foo.old", "demo/bar.sql"])
+    assert not trie.contains("demo/foo")
+    assert trie.contains("demo/bar")
+    assert PathTrie(complete=False).contains("demo/foo")
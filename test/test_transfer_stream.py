@@ -0,0 +1,23 @@
+import io
+from dbdemos.transfer_stream import TransferStream
+
+
+def test_read():
+    chunks = [b"abc", b"", b"defgh", b"i"]
+    stream = TransferStream(chunks, 9)
+    assert len(stream) == 9
+    assert stream.read(2) == b"ab"
+    assert stream.read(4) == b"c"
+    assert stream.tell() == 3
+    assert stream.read() == b"defghi"
+    assert stream.read(1) == b""
+    assert stream.position == 9
+    #buffered reads, as done by the http client
+    assert io.BufferedReader(TransferStream(chunks), 4).read() == b"abcdefghi"
+
+
+def test_checksum():
+    import hashlib
+    checksum = hashlib.sha1()
+    assert TransferStream([b"abc", b"def"], 6, checksum).read() == b"abcdef"
+    assert checksum.hexdigest() == hashlib.sha1(b"abcdef").hexdigest()
@@ -0,0 +1,30 @@
+import types
+from dbdemos.uc_preflight import UnityCatalogPreflight
+
+
+def test_resolve():
+    calls = []
+    def getter(existing):
+        def get(name):
+            calls.append(name)
+            if name not in existing:
+                raise Exception(f"{name} not found")
+            return types.SimpleNamespace(name=name)
+        return get
+    ws = types.SimpleNamespace(catalogs=types.SimpleNamespace(get=getter(["main"])),
+                               schemas=types.SimpleNamespace(get=getter(["main.demo"])),
+                               volumes=types.SimpleNamespace(read=getter([])),
+                               tables=types.SimpleNamespace(get=getter(["main.demo.t1"])))
+    preflight = UnityCatalogPreflight(ws)
+    preflight.resolve("main", "demo", "raw", ["main.demo.t1", "main.demo.t2", "main.demo.*"])
+    assert sorted(calls) == ["main", "main.demo", "main.demo.raw", "main.demo.t1", "main.demo.t2"]
+    assert preflight.exists(UnityCatalogPreflight.SCHEMA, "main.demo")
+    volume, error = preflight.get(UnityCatalogPreflight.VOLUME, "main.demo.raw")
+    assert volume is None and "not found" in str(error)
+    preflight.set(UnityCatalogPreflight.VOLUME, "main.demo.raw", "created")
+    assert preflight.exists(UnityCatalogPreflight.VOLUME, "main.demo.raw")
+    #answers are cached
+    assert not preflight.exists(UnityCatalogPreflight.TABLE, "main.demo.t2")
+    assert len(calls) == 5
+    preflight.resolve(tables=["main.demo.t2"], refresh=True)
+    assert len(calls) == 6
@@ -0,0 +1,25 @@
+import io
+import zipfile
+from dbdemos.workspace_archive import WorkspaceArchive
+
+
+def test_object_types(tmp_path):
+    zip_path = str(tmp_path / "folder.zip")
+    with zipfile.ZipFile(zip_path, "w") as z:
+        z.writestr("my-demo/01-notebook.py", "# Databricks notebook source\nprint('hello')")
+        z.writestr("my-demo/_resources/02-sql.sql", "-- Databricks notebook source\nSELECT 1")
+        z.writestr("my-demo/config.py", "catalog = 'main'")
+        z.writestr("my-demo/app/app.yaml", "command: ['python', 'app.py']")
+        z.writestr("my-demo/app/app.py", "import os")
+    archive = WorkspaceArchive(zip_path, "/Repos/dbdemos/dbdemos-notebooks/my-demo")
+    root = "/Repos/dbdemos/dbdemos-notebooks/my-demo/"
+    assert archive.get_object_type(root+"01-notebook") == "NOTEBOOK"
+    assert archive.get_object_type(root+"_resources/02-sql") == "NOTEBOOK"
+    assert archive.get_object_type(root+"config.py") == "FILE"
+    assert archive.get_object_type(root+"app") == "DIRECTORY"
+    assert archive.get_object_type(root+"missing") is None
+    assert archive.get_object_type("/Repos/dbdemos/dbdemos-notebooks/other-demo/01-notebook") is None
+    assert archive.read_file(root+"config.py") == b"catalog = 'main'"
+    with zipfile.ZipFile(io.BytesIO(archive.get_directory_zip(root+"app"))) as z:
+        assert sorted(z.namelist()) == ["app/app.py", "app/app.yaml"]
+    archive.close()
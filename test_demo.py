@@ -40,29 +40,31 @@ def bundle(conf, demo_path_in_repo):
   "branch": "master"
 }
 """
-conf = load_conf("local_conf_azure.json")
+#the packager renders the notebooks in spawned processes, which import this script again
+if __name__ == "__main__":
+    conf = load_conf("local_conf_azure.json")
 
-#This will create the bundle and save it in the local ./bundles and ./minisite folder.
-#change the path with your demo path in the https://github.com/databricks/field-demo repo (your fork)
-try:
-    bundle(conf, "product_demos/Data-Science/mlops-end2end")
-except Exception as e:
-    print(f"Failure building the job: {e}")
-    raise e
+    #This will create the bundle and save it in the local ./bundles and ./minisite folder.
+    #change the path with your demo path in the https://github.com/databricks/field-demo repo (your fork)
+    try:
+        bundle(conf, "product_demos/Data-Science/mlops-end2end")
+    except Exception as e:
+        print(f"Failure building the job: {e}")
+        raise e
 
-# Now that your demo is packaged, we can install it & test.
-# We recommend testing in a new workspace so that you have a fresh install
-# Load the conf for the workspace where you want to install the demo:
-conf = load_conf("local_conf_azure.json")
+    # Now that your demo is packaged, we can install it & test.
+    # We recommend testing in a new workspace so that you have a fresh install
+    # Load the conf for the workspace where you want to install the demo:
+    conf = load_conf("local_conf_azure.json")
 
-import dbdemos
-try:
-    #Install your demo in a given folder:
-    dbdemos.install("mlops-end2end", "/Users/quentin.ambard@databricks.com/test_install_quentin", True, conf.username,
-                    conf.pat_token, conf.workspace_url, cloud="AZURE", start_cluster = False)
-    #Check if the init job is successful:
-    dbdemos.check_status("sql-ai-functions", conf.username, conf.pat_token, conf.workspace_url, cloud="AWS")
-    print("looking good! Ready to send your PR with your new demo!")
-except Exception as e:
-    print(f"Failure  installing the demo: {e}")
-    raise e
\ No newline at end of file
+    import dbdemos
+    try:
+        #Install your demo in a given folder:
+        dbdemos.install("mlops-end2end", "/Users/quentin.ambard@databricks.com/test_install_quentin", True, conf.username,
+                        conf.pat_token, conf.workspace_url, cloud="AZURE", start_cluster = False)
+        #Check if the init job is successful:
+        dbdemos.check_status("sql-ai-functions", conf.username, conf.pat_token, conf.workspace_url, cloud="AWS")
+        print("looking good! Ready to send your PR with your new demo!")
+    except Exception as e:
+        print(f"Failure  installing the demo: {e}")
+        raise e
\ No newline at end of file